@@ -0,0 +1,258 @@
+import json
+import os
+import shutil
+import time
+import uuid
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from .models import CombinedData
+from .utils import TOPIC_INDICATOR_COLUMNS, parse_assigned_labels
+
+CURRENT_FILENAME = "CURRENT"
+META_FILENAME = "meta.json"
+ROW_COUNT_CACHE_KEY = "analytics_snapshot:db_rows"
+ANALYTICS_SNAPSHOT_QUEUED_KEY = "analytics_snapshot:queued"
+ANALYTICS_SNAPSHOT_GENERATION_KEY = "analytics_snapshot:generation"
+ARRAY_NAMES = (
+    "state", "label_offsets", "label_ids", "label_source", "confidence",
+    "score", "num_comments", "lead_time", "created", "indicators",
+)
+
+
+def snapshot_root():
+    return settings.ANALYTICS_SNAPSHOT_DIR
+
+
+def build_analytics_snapshot():
+    """
+    Writes the combined_data columns the aggregations need as .npy files in a
+    new version directory, then points CURRENT at it. Strings (state, label,
+    label source) are stored as small integer codes with their vocabularies in
+    meta.json; each row's labels are a slice label_ids[label_offsets[i]:
+    label_offsets[i + 1]]. The previous version is kept for workers still
+    mapping it; older ones are removed.
+
+    Returns:
+        str: The new version name.
+    """
+    # Cleared before reading so a write during this build queues the next one
+    cache.delete(ANALYTICS_SNAPSHOT_QUEUED_KEY)
+    cache.add(ANALYTICS_SNAPSHOT_GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+    generation = cache.get(ANALYTICS_SNAPSHOT_GENERATION_KEY)
+    vocab = {"state": {}, "label": {}, "label_source": {}}
+    label_names = {}
+    # Every spelling, as the unfiltered topic list has always listed them
+    topic_names = set()
+    columns = {name: [] for name in ARRAY_NAMES if name not in ("label_offsets", "label_ids", "indicators")}
+    label_offsets = [0]
+    label_ids = []
+    indicators = []
+
+    fields = ["state", "assigned_label", "label_source", "confidence_score", "score", "num_comments", "lead_time", "created_time"]
+    for row in CombinedData.objects.values_list(*fields, *TOPIC_INDICATOR_COLUMNS).iterator(chunk_size=2000):
+        state, assigned_label, label_source, confidence, score, num_comments, lead_time, created_time = row[:8]
+        columns["state"].append(vocab["state"].setdefault(state, len(vocab["state"])))
+        columns["label_source"].append(vocab["label_source"].setdefault(label_source.strip(), len(vocab["label_source"])))
+        columns["confidence"].append(confidence)
+        columns["score"].append(score)
+        columns["num_comments"].append(num_comments)
+        columns["lead_time"].append(lead_time)
+        columns["created"].append(int(created_time.timestamp()) if created_time else None)
+
+        # A row carries each topic once even if the label is repeated
+        row_labels = set()
+        for label in parse_assigned_labels(assigned_label):
+            key = label.strip().lower()
+            label_names.setdefault(key, label.strip())
+            topic_names.add(label.strip())
+            row_labels.add(vocab["label"].setdefault(key, len(vocab["label"])))
+        label_ids.extend(sorted(row_labels))
+        label_offsets.append(len(label_ids))
+        indicators.append(row[8:])
+
+    arrays = {
+        "state": np.asarray(columns["state"], dtype=np.int16),
+        "label_offsets": np.asarray(label_offsets, dtype=np.int64),
+        "label_ids": np.asarray(label_ids, dtype=np.int16),
+        "label_source": np.asarray(columns["label_source"], dtype=np.int16),
+        "confidence": np.asarray(columns["confidence"], dtype=np.float64),
+        "score": np.asarray(columns["score"], dtype=np.float32),
+        "num_comments": np.asarray(columns["num_comments"], dtype=np.int32),
+        "lead_time": np.asarray(columns["lead_time"], dtype=np.float32),
+        "created": np.asarray([np.datetime64(value, "s") if value is not None else np.datetime64("NaT") for value in columns["created"]], dtype="datetime64[s]"),
+        "indicators": (np.asarray(indicators, dtype=np.int64).reshape(-1, len(TOPIC_INDICATOR_COLUMNS)) > 0).astype(np.uint8),
+    }
+
+    root = snapshot_root()
+    version = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    directory = os.path.join(root, version)
+    os.makedirs(directory)
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, f"{name}.npy"), array)
+
+    meta = {
+        "version": version,
+        "built_at": time.time(),
+        "generation": generation,
+        "rows": len(columns["state"]),
+        "states": list(vocab["state"]),
+        "labels": list(vocab["label"]),
+        "label_names": [label_names[key] for key in vocab["label"]],
+        "topic_names": sorted(topic_names),
+        "label_sources": list(vocab["label_source"]),
+        "indicator_columns": TOPIC_INDICATOR_COLUMNS,
+    }
+    with open(os.path.join(directory, META_FILENAME), "w") as f:
+        json.dump(meta, f)
+
+    current_path = os.path.join(root, CURRENT_FILENAME)
+    previous = read_current_version(root)
+    with open(f"{current_path}.tmp", "w") as f:
+        f.write(version)
+    os.replace(f"{current_path}.tmp", current_path)
+
+    for name in os.listdir(root):
+        if name not in (version, previous, CURRENT_FILENAME) and os.path.isdir(os.path.join(root, name)):
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+    cache.delete(ROW_COUNT_CACHE_KEY)
+    print(f"Wrote analytics snapshot {version} ({meta['rows']} rows).")
+    return version
+
+
+def read_current_version(root):
+    try:
+        with open(os.path.join(root, CURRENT_FILENAME)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+class AnalyticsSnapshot:
+    """
+    Read-only view of one snapshot version. Arrays are memory-mapped, so every
+    worker on the host shares the same pages instead of holding its own copy.
+    """
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, META_FILENAME)) as f:
+            self.meta = json.load(f)
+        self.arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in ARRAY_NAMES}
+        self.label_codes = {label: code for code, label in enumerate(self.meta["labels"])}
+        self.source_codes = {source: code for code, source in enumerate(self.meta["label_sources"])}
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def rows_with_label(self, topic):
+        """
+        Returns the indexes of rows labeled with topic (case-insensitive).
+        """
+        code = self.label_codes.get(topic.strip().lower())
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        positions = np.flatnonzero(self["label_ids"] == code)
+        return np.searchsorted(self["label_offsets"], positions, side="right") - 1
+
+    def filter_rows(self, rows, min_confidence=None, label_source=None):
+        if min_confidence is not None:
+            rows = rows[self["confidence"][rows] >= min_confidence]
+        if label_source is not None:
+            code = self.source_codes.get(label_source)
+            if code is None:
+                return rows[:0]
+            rows = rows[self["label_source"][rows] == code]
+        return rows
+
+    def state_mask(self, state):
+        """
+        Returns a boolean row mask for a state, or None for all states.
+        """
+        if not state:
+            return None
+        try:
+            code = self.meta["states"].index(state)
+        except ValueError:
+            return np.zeros(self.meta["rows"], dtype=bool)
+        return self["state"] == code
+
+    def ideology_counts(self, topic, min_confidence=None, label_source=None):
+        rows = self.filter_rows(self.rows_with_label(topic), min_confidence, label_source)
+        counts = np.bincount(self["state"][rows], minlength=len(self.meta["states"]))
+        return [
+            {"state": state, "count": int(count)}
+            for state, count in zip(self.meta["states"], counts)
+            if count
+        ]
+
+    def topics(self, min_confidence=None, label_source=None):
+        # Same as get_ideology_topics: case variants are listed separately
+        # unfiltered, and once per topic when filtered
+        if min_confidence is None and label_source is None:
+            return self.meta["topic_names"]
+        rows = self.filter_rows(np.arange(self.meta["rows"]), min_confidence, label_source)
+        row_mask = np.zeros(self.meta["rows"], dtype=bool)
+        row_mask[rows] = True
+        # Expand the row mask to label positions, then collect the labels present
+        label_rows = np.repeat(np.arange(self.meta["rows"]), np.diff(self["label_offsets"]))
+        codes = np.unique(self["label_ids"][row_mask[label_rows]])
+        return sorted({self.meta["label_names"][code] for code in codes})
+
+    def cooccurrence(self, state=None):
+        indicators = self["indicators"]
+        mask = self.state_mask(state)
+        if mask is not None:
+            indicators = indicators[mask]
+        if not len(indicators):
+            return None
+        indicators = np.asarray(indicators, dtype=np.int64)
+        return {"topics": self.meta["indicator_columns"], "matrix": (indicators.T @ indicators).tolist()}
+
+
+def invalidate_analytics_snapshot():
+    """
+    Marks every snapshot built so far as stale, including one being built
+    now, by starting a new generation.
+    """
+    cache.set(ANALYTICS_SNAPSHOT_GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def snapshot_is_fresh(snapshot):
+    """
+    A snapshot is used only while no combined_data write has started a new
+    generation since it was built, it is younger than
+    ANALYTICS_SNAPSHOT_MAX_AGE, and it has as many rows as combined_data
+    (counted at most every 5 minutes, for bulk loads that skip the signals).
+    """
+    if cache.get(ANALYTICS_SNAPSHOT_GENERATION_KEY) != snapshot.meta.get("generation"):
+        return False
+    max_age = getattr(settings, "ANALYTICS_SNAPSHOT_MAX_AGE", 8 * 3600)
+    if time.time() - snapshot.meta.get("built_at", 0) > max_age:
+        return False
+    return cache.get_or_set(ROW_COUNT_CACHE_KEY, CombinedData.objects.count, timeout=300) == snapshot.meta["rows"]
+
+
+_snapshot = None
+
+def get_analytics_snapshot():
+    """
+    Returns this process's mapping of the current snapshot, remapping when
+    CURRENT points at a new version, or None if no snapshot has been built or
+    it is stale.
+    """
+    global _snapshot
+
+    root = snapshot_root()
+    version = read_current_version(root)
+    if version is None:
+        return None
+    if _snapshot is None or _snapshot.meta["version"] != version:
+        try:
+            _snapshot = AnalyticsSnapshot(os.path.join(root, version))
+        except (OSError, ValueError) as e:
+            print(f"Failed to load analytics snapshot {version}: {e}")
+            return None
+    if not snapshot_is_fresh(_snapshot):
+        return None
+    return _snapshot
@@ -0,0 +1,147 @@
+import logging
+import pickle
+import uuid
+import zlib
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Values larger than this are split across several keys so no single Redis
+# transfer is multi-megabyte
+CHUNK_SIZE = 512 * 1024
+# Payloads below this are stored uncompressed; zlib gains nothing on them
+COMPRESS_MIN_SIZE = 1024
+# zlib level 1 trades a little ratio for much faster compression
+COMPRESS_LEVEL = 1
+CODEC_MARKER = "__cache_codec__"
+
+
+def chunk_key(key, version, index):
+    return f"{key}:chunk:{version}:{index}"
+
+
+def chunk_meta_key(key):
+    # The chunk version and count of a chunked value, kept apart from the
+    # header so replacing a value doesn't fetch the old payload
+    return f"{key}:chunks"
+
+
+def is_header(value):
+    return isinstance(value, dict) and value.get(CODEC_MARKER) == 1
+
+
+def set_value(key, value, timeout=14400):
+    """
+    Stores a value under key as a compressed pickle. Payloads larger than
+    CHUNK_SIZE are written to versioned chunk keys first and the header at key
+    is swapped last, so readers see either the old or the new value in full;
+    the previous version's chunks are then deleted in one call, and a read
+    that loses that race is treated as a miss. Size metrics for the key are
+    stored under cache_size:<key> and logged at debug level.
+    """
+    raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    compressed = len(raw) >= COMPRESS_MIN_SIZE
+    payload = zlib.compress(raw, COMPRESS_LEVEL) if compressed else raw
+    metrics = {"raw_bytes": len(raw), "stored_bytes": len(payload), "chunks": 0}
+
+    header = {CODEC_MARKER: 1, "compressed": compressed}
+    entries = {key: header, f"cache_size:{key}": metrics}
+    if len(payload) <= CHUNK_SIZE:
+        header["data"] = payload
+    else:
+        version = uuid.uuid4().hex[:12]
+        chunks = (len(payload) + CHUNK_SIZE - 1) // CHUNK_SIZE
+        cache.set_many(
+            {chunk_key(key, version, i): payload[i * CHUNK_SIZE:(i + 1) * CHUNK_SIZE] for i in range(chunks)},
+            timeout=timeout,
+        )
+        header["version"] = version
+        header["chunks"] = metrics["chunks"] = chunks
+        entries[chunk_meta_key(key)] = {"version": version, "chunks": chunks}
+
+    previous = cache.get(chunk_meta_key(key))
+    cache.set_many(entries, timeout=timeout)
+
+    if previous:
+        stale = [chunk_key(key, previous["version"], i) for i in range(previous["chunks"])]
+        if not metrics["chunks"]:
+            stale.append(chunk_meta_key(key))
+        cache.delete_many(stale)
+
+    logger.debug(
+        "Cache size for key: %s - %s bytes raw, %s bytes stored, %s chunks",
+        key, metrics["raw_bytes"], metrics["stored_bytes"], metrics["chunks"],
+    )
+
+
+def set_many_values(values, timeout=14400):
+    """
+    Stores several values in one round trip. Meant for many small values such
+    as per-object entries: anything that would need chunking falls back to
+    set_value, and replaced chunked versions are left to expire on their own.
+    """
+    headers = {}
+    metrics = {}
+    for key, value in values.items():
+        raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        compressed = len(raw) >= COMPRESS_MIN_SIZE
+        payload = zlib.compress(raw, COMPRESS_LEVEL) if compressed else raw
+        if len(payload) > CHUNK_SIZE:
+            set_value(key, value, timeout=timeout)
+            continue
+        headers[key] = {CODEC_MARKER: 1, "compressed": compressed, "data": payload}
+        metrics[f"cache_size:{key}"] = {"raw_bytes": len(raw), "stored_bytes": len(payload), "chunks": 0}
+
+    if headers:
+        cache.set_many({**headers, **metrics}, timeout=timeout)
+
+
+def decode_payload(header, payload):
+    raw = zlib.decompress(payload) if header["compressed"] else payload
+    return pickle.loads(raw)
+
+
+def get_many_values(keys):
+    """
+    Returns key -> value for the keys that are cached, decoding codec headers
+    and fetching all chunks of chunked values in one more get_many. Values not
+    written by set_value are returned as stored. A chunked value with missing
+    chunks is treated as a miss.
+    """
+    stored = cache.get_many(list(keys))
+    values = {}
+    chunked = {}
+
+    for key, value in stored.items():
+        if not is_header(value):
+            values[key] = value
+        elif "data" in value:
+            values[key] = decode_payload(value, value["data"])
+        else:
+            chunked[key] = value
+
+    if chunked:
+        chunk_keys = [
+            chunk_key(key, header["version"], i)
+            for key, header in chunked.items()
+            for i in range(header["chunks"])
+        ]
+        chunks = cache.get_many(chunk_keys)
+        for key, header in chunked.items():
+            parts = [chunks.get(chunk_key(key, header["version"], i)) for i in range(header["chunks"])]
+            if all(part is not None for part in parts):
+                values[key] = decode_payload(header, b"".join(parts))
+
+    return values
+
+
+def get_value(key, default=None):
+    return get_many_values([key]).get(key, default)
+
+
+def get_size_metrics(keys):
+    """
+    Returns key -> size metrics recorded by set_value for the given keys.
+    """
+    metrics = cache.get_many([f"cache_size:{key}" for key in keys])
+    return {key[len("cache_size:"):]: value for key, value in metrics.items()}
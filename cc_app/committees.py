@@ -0,0 +1,145 @@
+import uuid
+from collections import defaultdict
+from django.core.cache import cache
+from django.db import transaction
+from .models import Committee, CommitteeMembership, CongressMembers, parse_committee_assignments
+from .utils import get_cached_data
+
+COMMITTEE_INDEX_VERSION_KEY = "committee_index_version"
+COMMITTEES_CACHE_KEY = "committees"
+COMMITTEE_MEMBER_FIELDS = ("bioguide_id", "name", "party", "chamber", "state", "district")
+
+
+def committee_ids(names):
+    """
+    Returns lowercased name -> id for the given committee names, creating the
+    ones that don't exist yet.
+    """
+    wanted = {name.lower(): name for name in names}
+    existing = {name.lower(): pk for pk, name in Committee.objects.filter(name__in=wanted.values()).values_list("id", "name")}
+    missing = [Committee(name=name) for key, name in wanted.items() if key not in existing]
+    if missing:
+        Committee.objects.bulk_create(missing, ignore_conflicts=True)
+        existing.update({
+            name.lower(): pk
+            for pk, name in Committee.objects.filter(name__in=[c.name for c in missing]).values_list("id", "name")
+        })
+    return existing
+
+
+def sync_member_committees(member):
+    """
+    Replaces a member's committee memberships with the committees parsed from
+    their committee_assignments. Called on save so the relation stays current.
+    """
+    names = parse_committee_assignments(member.committee_assignments)
+    with transaction.atomic():
+        ids = committee_ids(names)
+        wanted = {ids[name.lower()] for name in names if name.lower() in ids}
+        current = set(member.committee_memberships.values_list("committee_id", flat=True))
+        member.committee_memberships.filter(committee_id__in=current - wanted).delete()
+        CommitteeMembership.objects.bulk_create(
+            [CommitteeMembership(committee_id=pk, member_id=member.pk) for pk in wanted - current]
+        )
+    if wanted != current:
+        invalidate_committee_index()
+    else:
+        # The listing also carries the member's name, party and seat
+        cache.delete(COMMITTEES_CACHE_KEY)
+
+
+def rebuild_committees():
+    """
+    Rebuilds every committee membership from congress_members, e.g. after a
+    bulk load that bypassed model saves.
+
+    Returns:
+        int: Number of memberships written.
+    """
+    assignments = {
+        bioguide_id: parse_committee_assignments(value)
+        for bioguide_id, value in CongressMembers.objects.values_list("bioguide_id", "committee_assignments")
+    }
+    with transaction.atomic():
+        CommitteeMembership.objects.all().delete()
+        ids = committee_ids({name for names in assignments.values() for name in names})
+        memberships = [
+            CommitteeMembership(committee_id=ids[name.lower()], member_id=bioguide_id)
+            for bioguide_id, names in assignments.items()
+            for name in names
+        ]
+        CommitteeMembership.objects.bulk_create(memberships, batch_size=1000)
+    invalidate_committee_index()
+    print(f"Rebuilt {len(memberships)} committee memberships for {len(ids)} committees.")
+    return len(memberships)
+
+
+class CommitteeIndex:
+    """
+    In-memory inverted index from committee to member ids, so a committee
+    lookup costs O(members of that committee).
+    """
+
+    def __init__(self, rows):
+        self.names = {}
+        self.members = defaultdict(list)
+        for name, bioguide_id in rows:
+            self.names.setdefault(name.lower(), name)
+            self.members[name.lower()].append(bioguide_id)
+
+    def member_ids(self, name):
+        return self.members.get(name.strip().lower(), [])
+
+    def name(self, name):
+        return self.names.get(name.strip().lower())
+
+
+_committee_index = None
+_committee_index_version = None
+
+def get_committee_index():
+    """
+    Returns this process's committee index, rebuilt from committee_memberships
+    in one query whenever the version published in the cache changes.
+    """
+    global _committee_index, _committee_index_version
+
+    version = cache.get(COMMITTEE_INDEX_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(COMMITTEE_INDEX_VERSION_KEY, version, timeout=None)
+
+    if version != _committee_index_version:
+        rows = CommitteeMembership.objects.order_by("committee__name", "member_id").values_list("committee__name", "member_id")
+        _committee_index = CommitteeIndex(rows)
+        _committee_index_version = version
+        print(f"Built committee index ({len(_committee_index.members)} committees).")
+
+    return _committee_index
+
+
+def invalidate_committee_index():
+    """
+    Called when memberships change so every worker rebuilds its index.
+    """
+    cache.delete_many([COMMITTEE_INDEX_VERSION_KEY, COMMITTEES_CACHE_KEY])
+
+
+def get_committees():
+    """
+    Returns every committee with members, each with its members' summary
+    fields, sorted by committee name.
+    """
+    def fetch_committees():
+        index = get_committee_index()
+        members = {row["bioguide_id"]: row for row in CongressMembers.objects.values(*COMMITTEE_MEMBER_FIELDS)}
+        return [
+            {
+                "name": index.names[key],
+                "member_count": len(ids),
+                "members": [members[pk] for pk in ids if pk in members],
+            }
+            for key, ids in sorted(index.members.items())
+        ]
+
+    return get_cached_data(COMMITTEES_CACHE_KEY, fetch_committees)
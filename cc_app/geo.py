@@ -0,0 +1,310 @@
+import json
+import math
+from collections import defaultdict
+from django.core.cache import cache
+from .cache_codec import get_value, set_value
+from .topology_store import get_current_topology, get_current_topology_bytes, get_current_hashes
+
+DISTRICT_INDEX_VERSION_KEY = "district_spatial_index_version"
+GRID_CELL_DEGREES = 1.0
+# 5 decimal places is roughly 1 m, well below what the map can show
+GEOJSON_PRECISION = 5
+
+GEOJSON_LAYERS = {
+    "states": {
+        "object": "us_states",
+        "state_abbr": lambda properties: properties.get("STUSPS"),
+    },
+    "districts": {
+        "object": "congressional_districts",
+        "state_abbr": lambda properties: str(properties.get("OFFICE_ID", ""))[:2],
+    },
+}
+
+
+def decode_arcs(topology):
+    """
+    Returns the arcs of a TopoJSON topology as lists of (lon, lat) points,
+    undoing delta encoding and quantization when the topology has a transform.
+    """
+    transform = topology.get("transform")
+    if not transform:
+        return [[(point[0], point[1]) for point in arc] for arc in topology.get("arcs", [])]
+
+    scale_x, scale_y = transform["scale"]
+    translate_x, translate_y = transform["translate"]
+    arcs = []
+    for arc in topology.get("arcs", []):
+        x = y = 0
+        points = []
+        for point in arc:
+            x += point[0]
+            y += point[1]
+            points.append((x * scale_x + translate_x, y * scale_y + translate_y))
+        arcs.append(points)
+    return arcs
+
+
+def stitch_ring(arc_indexes, arcs):
+    """
+    Joins the arcs referenced by a TopoJSON ring into one closed list of points.
+    Negative indexes (~i) reference arc i reversed.
+    """
+    ring = []
+    for index in arc_indexes:
+        points = arcs[~index][::-1] if index < 0 else arcs[index]
+        ring.extend(points[1:] if ring else points)
+    return ring
+
+
+def geometry_polygons(geometry, arcs):
+    """
+    Returns a Polygon or MultiPolygon TopoJSON geometry as a list of polygons,
+    each a list of rings. Other geometry types have no area and return [].
+    """
+    if geometry.get("type") == "Polygon":
+        return [[stitch_ring(ring, arcs) for ring in geometry["arcs"]]]
+    if geometry.get("type") == "MultiPolygon":
+        return [[stitch_ring(ring, arcs) for ring in polygon] for polygon in geometry["arcs"]]
+    return []
+
+
+def topology_features(topology, object_name):
+    """
+    Yields (properties, polygons) for every geometry of a TopoJSON object.
+    """
+    arcs = decode_arcs(topology)
+    for geometry in topology.get("objects", {}).get(object_name, {}).get("geometries", []):
+        yield geometry.get("properties", {}), geometry_polygons(geometry, arcs)
+
+
+def point_in_rings(lon, lat, rings):
+    """
+    Even-odd ray casting over every ring, so holes and multiple parts are
+    handled without distinguishing outer and inner rings.
+    """
+    inside = False
+    for ring in rings:
+        for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+            if (y1 > lat) != (y2 > lat) and lon < (x2 - x1) * (lat - y1) / (y2 - y1) + x1:
+                inside = not inside
+    return inside
+
+
+class DistrictIndex:
+    """
+    Uniform-grid spatial index over congressional district bounding boxes.
+    A lookup tests only the districts whose boxes overlap the point's grid cell.
+    """
+
+    def __init__(self, topology, state_names=None, cell_degrees=GRID_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.districts = []
+        self.grid = defaultdict(list)
+        state_names = state_names or {}
+
+        for properties, polygons in topology_features(topology, "congressional_districts"):
+            rings = [ring for polygon in polygons for ring in polygon if ring]
+            if not rings:
+                continue
+
+            lons = [point[0] for ring in rings for point in ring]
+            lats = [point[1] for ring in rings for point in ring]
+            office_id = str(properties.get("OFFICE_ID", ""))
+            state_abbr = office_id[:2]
+            self.districts.append({
+                "office_id": office_id,
+                "state_abbr": state_abbr,
+                "state": state_names.get(state_abbr, state_abbr),
+                "district": parse_district_number(properties.get("DISTRICT"), office_id),
+                "bbox": (min(lons), min(lats), max(lons), max(lats)),
+                "rings": rings,
+            })
+
+            index = len(self.districts) - 1
+            min_x, min_y, max_x, max_y = self.districts[index]["bbox"]
+            for cell_x in range(self.cell(min_x), self.cell(max_x) + 1):
+                for cell_y in range(self.cell(min_y), self.cell(max_y) + 1):
+                    self.grid[(cell_x, cell_y)].append(index)
+
+    def cell(self, degrees):
+        return math.floor(degrees / self.cell_degrees)
+
+    def locate(self, lon, lat):
+        """
+        Returns the district containing the point, or None.
+        """
+        for index in self.grid.get((self.cell(lon), self.cell(lat)), []):
+            district = self.districts[index]
+            min_x, min_y, max_x, max_y = district["bbox"]
+            if min_x <= lon <= max_x and min_y <= lat <= max_y and point_in_rings(lon, lat, district["rings"]):
+                return district
+        return None
+
+
+def parse_district_number(value, office_id):
+    """
+    Returns the district number from the DISTRICT property, falling back to the
+    last two characters of OFFICE_ID. At-large districts are 0.
+    """
+    for candidate in (value, office_id[-2:]):
+        try:
+            return int(candidate)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def state_names_by_abbr():
+    """
+    Maps state abbreviations to the full names used by congress_members, taken
+    from the current states TopoJSON.
+    """
+    topology = get_current_topology("states")
+    if topology is None:
+        return {}
+    return {
+        geometry["properties"]["STUSPS"]: geometry["properties"]["NAME"]
+        for geometry in topology.get("objects", {}).get("us_states", {}).get("geometries", [])
+        if "STUSPS" in geometry.get("properties", {}) and "NAME" in geometry.get("properties", {})
+    }
+
+
+_district_index = None
+_district_index_version = None
+
+def get_district_index():
+    """
+    Returns this process's district index. The version published in the cache
+    is the pair of current districts / states TopoJSON content hashes, so the
+    index is only rebuilt after a new TopoJSON is stored.
+    """
+    global _district_index, _district_index_version
+
+    version = cache.get(DISTRICT_INDEX_VERSION_KEY)
+    if version is None:
+        hashes = get_current_hashes()
+        if "districts" not in hashes:
+            return None
+        version = (hashes["districts"], hashes.get("states"))
+        cache.set(DISTRICT_INDEX_VERSION_KEY, version, timeout=None)
+
+    if version != _district_index_version:
+        topology = get_current_topology("districts")
+        if topology is None:
+            cache.delete(DISTRICT_INDEX_VERSION_KEY)
+            return None
+        _district_index = DistrictIndex(topology, state_names_by_abbr())
+        _district_index_version = version
+        print(f"Built district spatial index for TopoJSON {version[0][:12]} ({len(_district_index.districts)} districts).")
+
+    return _district_index
+
+
+def invalidate_district_index():
+    """
+    Called when a new TopoJSON is stored so every worker rebuilds its index.
+    """
+    cache.delete(DISTRICT_INDEX_VERSION_KEY)
+
+
+def geojson_cache_key(layer, content_hash, state_abbr=None):
+    # Keyed by the TopoJSON content hash so a new upload never serves the
+    # previous version's states
+    return f"us_{layer}_geojson:{content_hash[:16]}:{state_abbr or 'all'}"
+
+
+def geojson_index_key(layer):
+    return f"us_{layer}_geojson:index"
+
+
+GEOJSON_QUEUED_KEY = "us_geojson:queued"
+
+
+def topology_to_geojson_features(topology, object_name, precision=GEOJSON_PRECISION):
+    """
+    Converts a TopoJSON object to GeoJSON features (the equivalent of
+    topojson.feature() in the browser) with coordinates rounded to precision.
+    """
+    arcs = [[(round(x, precision), round(y, precision)) for x, y in arc] for arc in decode_arcs(topology)]
+    features = []
+    for geometry in topology.get("objects", {}).get(object_name, {}).get("geometries", []):
+        polygons = geometry_polygons(geometry, arcs)
+        if not polygons:
+            continue
+        feature = {"type": "Feature", "properties": geometry.get("properties", {})}
+        if "id" in geometry:
+            feature["id"] = geometry["id"]
+        if geometry["type"] == "Polygon":
+            feature["geometry"] = {"type": "Polygon", "coordinates": polygons[0]}
+        else:
+            feature["geometry"] = {"type": "MultiPolygon", "coordinates": polygons}
+        features.append(feature)
+    return features
+
+
+def encode_feature_collection(features):
+    return json.dumps({"type": "FeatureCollection", "features": features}, separators=(",", ":")).encode("utf-8")
+
+
+def build_geojson_payloads(layer, topology=None, content_hash=None, timeout=None):
+    """
+    Converts the current TopoJSON of a layer ("states" or "districts") into the
+    encoded national FeatureCollection plus one per state, and caches them all
+    along with an index of (content hash, states with a payload). Called when
+    a version is stored and by the refresh_geojson_payloads task; the payloads
+    are kept until the next build.
+
+    Returns:
+        dict: cache key -> encoded GeoJSON bytes, empty if no TopoJSON is stored.
+    """
+    config = GEOJSON_LAYERS[layer]
+    previous = cache.get(geojson_index_key(layer))
+    if topology is None or content_hash is None:
+        current = get_current_topology_bytes(layer)
+        if current is None:
+            # Built, but there is nothing to serve
+            cache.set(geojson_index_key(layer), (None, []), timeout=timeout)
+            return {}
+        content_hash, body = current
+        topology = json.loads(body)
+
+    features = topology_to_geojson_features(topology, config["object"])
+    by_state = defaultdict(list)
+    for feature in features:
+        by_state[config["state_abbr"](feature["properties"])].append(feature)
+
+    states = sorted(state_abbr for state_abbr in by_state if state_abbr)
+    payloads = {geojson_cache_key(layer, content_hash): encode_feature_collection(features)}
+    for state_abbr in states:
+        payloads[geojson_cache_key(layer, content_hash, state_abbr)] = encode_feature_collection(by_state[state_abbr])
+
+    for cache_key, payload in payloads.items():
+        set_value(cache_key, payload, timeout=timeout)
+    # Written last so readers never see an index whose payloads aren't cached yet
+    cache.set(geojson_index_key(layer), (content_hash, states), timeout=timeout)
+    if previous is not None and previous[0] not in (None, content_hash):
+        # The previous version's payloads have no TTL to expire them
+        previous_hash, previous_states = previous
+        cache.delete_many([
+            geojson_cache_key(layer, previous_hash, state_abbr) for state_abbr in [None, *previous_states]
+        ])
+    print(f"Cached {len(payloads)} GeoJSON payloads for {layer}.")
+    return payloads
+
+
+def get_geojson_payload(layer, state_abbr=None):
+    """
+    Returns the encoded GeoJSON for a layer, optionally for one state. Returns
+    b"" if there is no such state or no TopoJSON is stored, and None if the
+    payloads aren't built (or one was evicted); never builds them itself.
+    """
+    state_abbr = state_abbr.strip().upper() if state_abbr else None
+    index = cache.get(geojson_index_key(layer))
+    if index is None:
+        return None
+
+    content_hash, states = index
+    if content_hash is None or (state_abbr and state_abbr not in states):
+        return b""
+    return get_value(geojson_cache_key(layer, content_hash, state_abbr))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from cc_app.analytics import build_analytics_snapshot, snapshot_root
+
+
+class Command(BaseCommand):
+    help = "Write the memory-mapped analytics snapshot of combined_data used by the aggregation endpoints."
+
+    def handle(self, *args, **options):
+        version = build_analytics_snapshot()
+        self.stdout.write(self.style.SUCCESS(f"Built analytics snapshot {version} in {snapshot_root()}"))
@@ -0,0 +1,188 @@
+import random
+from datetime import datetime, timedelta, timezone
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models
+from cc_app.models import (
+    CombinedData, CongressMembers, CongressMembersWithProportions, USStateTopojson, USDistrictTopojson, CurrentTopojson,
+)
+from cc_app.analytics import build_analytics_snapshot
+from cc_app.committees import rebuild_committees
+from cc_app.geo import invalidate_district_index, build_geojson_payloads
+from cc_app.search import rebuild_search_index
+from cc_app.snapshots import invalidate_snapshots
+from cc_app.topology_store import store_topology
+from cc_app.utils import TOPIC_INDICATOR_COLUMNS, rebuild_topic_trend_rollups, build_confidence_index
+from cc_app.utils import build_engagement_histograms
+
+STATES = [
+    ("AL", "Alabama"), ("AZ", "Arizona"), ("CA", "California"), ("CO", "Colorado"), ("FL", "Florida"),
+    ("GA", "Georgia"), ("IL", "Illinois"), ("MI", "Michigan"), ("NC", "North Carolina"), ("NY", "New York"),
+    ("OH", "Ohio"), ("PA", "Pennsylvania"), ("TX", "Texas"), ("VA", "Virginia"), ("WA", "Washington"),
+    ("WY", "Wyoming"),
+]
+LOCAL_DB_HOSTS = {"", "localhost", "127.0.0.1", "::1"}
+LABEL_SOURCES = ["model", "annotator"]
+WORDS = (
+    "budget tax health care hospital border police school teacher farm crop energy climate "
+    "vote election broadband internet highway bridge rail veteran military trade tariff wage "
+    "housing rent drug price insurance court crime museum park water wildfire"
+).split()
+
+
+def label_name(column):
+    return column.replace("_and_", " and ").replace("_", " ").title().replace(" And ", " and ")
+
+
+def rectangle_topology(object_name, shapes):
+    """
+    Returns a TopoJSON topology with one rectangular polygon per
+    (properties, (min_lon, min_lat, max_lon, max_lat)) shape.
+    """
+    arcs, geometries = [], []
+    for properties, (x0, y0, x1, y1) in shapes:
+        arcs.append([[x0, y0], [x1, y0], [x1, y1], [x0, y1], [x0, y0]])
+        geometries.append({"type": "Polygon", "arcs": [[len(arcs) - 1]], "properties": properties})
+    return {
+        "type": "Topology",
+        "arcs": arcs,
+        "objects": {object_name: {"type": "GeometryCollection", "geometries": geometries}},
+    }
+
+
+def database_is_local():
+    """
+    True when the database is SQLite or on this machine, i.e. not the hosted
+    database. Env-var secrets alone don't count, since they can point anywhere.
+    """
+    return connection.vendor == "sqlite" or connection.settings_dict.get("HOST", "") in LOCAL_DB_HOSTS
+
+
+class Command(BaseCommand):
+    help = (
+        "Replace the app's tables with synthetic data for local and load testing. Requires --yes and refuses to "
+        "run in production or against a database that isn't local."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=20000, help="Number of combined_data rows.")
+        parser.add_argument("--districts-per-state", type=int, default=4)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--yes", action="store_true", help="Confirm that every row in the app's tables may be deleted.")
+
+    def handle(self, *args, **options):
+        if getattr(settings, "ENVIRONMENT", "development") == "production":
+            raise CommandError("load_synthetic_data deletes data and cannot run with DJANGO_ENV=production.")
+        if not database_is_local():
+            raise CommandError(
+                f"load_synthetic_data deletes data and refuses to run against {connection.settings_dict.get('HOST')}. "
+                "Use SQLite or a database on localhost."
+            )
+        if not options["yes"]:
+            raise CommandError(
+                f"load_synthetic_data deletes every post, member, proportion and TopoJSON row in "
+                f"{connection.settings_dict.get('NAME')}. Re-run with --yes to confirm."
+            )
+
+        # Every cached row, list and derived payload describes the data being
+        # replaced, and bulk_create below fires no signals to invalidate them
+        if hasattr(cache, "delete_pattern"):
+            # django-redis: only the cache's own keys, since Celery's broker and
+            # results share the Redis database
+            cache.delete_pattern("*")
+        else:
+            cache.clear()
+
+        rng = random.Random(options["seed"])
+        per_state = options["districts_per_state"]
+
+        # States on a grid of 4 x 4 degree cells, each split into vertical district strips
+        state_shapes, district_shapes = [], []
+        for i, (abbr, name) in enumerate(STATES):
+            x0, y0 = -124 + (i % 8) * 7, 30 + (i // 8) * 6
+            party = rng.choice("RD")
+            state_shapes.append(({"STATEFP": f"{i + 1:02d}", "STUSPS": abbr, "NAME": name, "STATE_PARTY": party}, (x0, y0, x0 + 4, y0 + 4)))
+            width = 4 / per_state
+            for d in range(per_state):
+                district_shapes.append((
+                    {
+                        "OFFICE_ID": f"{abbr}{d + 1:02d}", "DISTRICT": f"{d + 1:02d}", "PARTY": rng.choice("RD"),
+                        "LISTING_NAME": f"Member {abbr}-{d + 1}",
+                    },
+                    (x0 + d * width, y0, x0 + (d + 1) * width, y0 + 4),
+                ))
+
+        CurrentTopojson.objects.all().delete()
+        USStateTopojson.objects.all().delete()
+        USDistrictTopojson.objects.all().delete()
+        store_topology("states", rectangle_topology("us_states", state_shapes))
+        store_topology("districts", rectangle_topology("congressional_districts", district_shapes))
+        invalidate_district_index()
+        build_geojson_payloads("states")
+        build_geojson_payloads("districts")
+
+        members, proportions = [], []
+        proportion_fields = [f.name for f in CongressMembersWithProportions._meta.fields if isinstance(f, models.FloatField)]
+        for abbr, name in STATES:
+            seats = [("Senate", None), ("Senate", None)] + [("House of Representatives", d + 1) for d in range(per_state)]
+            for n, (chamber, district) in enumerate(seats):
+                bioguide_id = f"{abbr}{n:06d}"
+                common = {
+                    "bioguide_id": bioguide_id, "name": f"{name} Member {n}", "chamber": chamber, "state": name,
+                    "district": district, "sponsored_bills": rng.randint(0, 200), "cosponsored_bills": rng.randint(0, 600),
+                }
+                members.append(CongressMembers(
+                    **common, party=rng.choice(["Republican", "Democratic"]), start_year=str(rng.randint(1995, 2023)),
+                    image_url="", profile_url="", website_url="", address="", phone_number="",
+                    committee_assignments="; ".join(rng.sample(["House Committee on Agriculture", "House Committee on Ways and Means", "Senate Committee on Finance", "Senate Committee on Armed Services", "House Committee on Energy and Commerce"], 2)),
+                ))
+                proportions.append(CongressMembersWithProportions(**common, **{field: rng.random() for field in proportion_fields}))
+
+        CongressMembers.objects.all().delete()
+        CongressMembersWithProportions.objects.all().delete()
+        CongressMembers.objects.bulk_create(members)
+        CongressMembersWithProportions.objects.bulk_create(proportions)
+        rebuild_committees()
+
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        topics = [column for column in TOPIC_INDICATOR_COLUMNS if column != "other_uncategorized"]
+        CombinedData.objects.all().delete()
+        batch = []
+        for i in range(options["posts"]):
+            labels = rng.sample(topics, rng.choice([1, 1, 1, 2, 3]))
+            created = start + timedelta(seconds=rng.randint(0, 365 * 86400))
+            title = " ".join(rng.choices(WORDS, k=8))
+            text = " ".join(rng.choices(WORDS, k=40))
+            row = {
+                "annotation_id": i, "annotator": rng.randint(1, 5), "author": f"user{rng.randint(1, 5000)}",
+                "context_url": "", "created_at": created.isoformat(), "created_utc": str(int(created.timestamp())),
+                "created_time": created, "id": i, "image_url": "", "lead_time": rng.random() * 48,
+                "num_comments": rng.randint(0, 500), "original_image_url": "", "policy_area": label_name(labels[0]),
+                "post_id": f"p{i}", "score": float(rng.randint(0, 5000)), "selftext": text, "selftext_lemmatized": text,
+                "state": rng.choice(STATES)[1], "title": title, "title_lemmatized": title, "topic": label_name(labels[0]),
+                "updated_at": created.isoformat(), "url": "", "parsed_topics": "", "cleaned_title": title,
+                "cleaned_selftext": text, "combined_text": f"{title} {text}", "primary_label": label_name(labels[0]),
+                "assigned_label": [label_name(label) for label in labels], "label_source": rng.choice(LABEL_SOURCES),
+                "assigned_topics": ",".join(labels), "confidence_score": rng.random(),
+            }
+            row.update({column: int(column in labels) for column in TOPIC_INDICATOR_COLUMNS})
+            batch.append(CombinedData(**row))
+            if len(batch) >= 2000:
+                CombinedData.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            CombinedData.objects.bulk_create(batch)
+
+        # bulk_create skips the post_save signals, so build the derived tables
+        # here rather than lazily under the first concurrent requests
+        rebuild_topic_trend_rollups()
+        build_confidence_index()
+        build_engagement_histograms()
+        rebuild_search_index()
+        build_analytics_snapshot()
+        invalidate_snapshots()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {len(STATES)} states, {len(district_shapes)} districts, {len(members)} members and {options['posts']} posts."
+        ))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from cc_app.snapshots import publish_snapshots, snapshot_dir
+
+
+class Command(BaseCommand):
+    help = "Render the read-only API responses to content-hashed, gzipped JSON files served by the snapshot_file view."
+
+    def handle(self, *args, **options):
+        manifest = publish_snapshots()
+        self.stdout.write(self.style.SUCCESS(f"Published {len(manifest)} snapshots to {snapshot_dir()}"))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from cc_app.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index over every combined_data row, e.g. after a bulk load."
+
+    def handle(self, *args, **options):
+        indexed = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} posts for search"))
@@ -0,0 +1,88 @@
+# Generated by Django 5.1.5 on 2026-10-19 16:26
+
+from datetime import datetime, timezone
+
+from django.db import migrations, models
+
+
+def backfill_created_time(apps, schema_editor):
+    CombinedData = apps.get_model("cc_app", "CombinedData")
+    # Read from the database being migrated, not the router's read alias
+    rows = CombinedData.objects.using(schema_editor.connection.alias)
+    batch = []
+    for row in rows.only("created_utc", "created_at", "created_time").iterator():
+        for value in (row.created_utc, row.created_at):
+            if not value:
+                continue
+            value = str(value).strip()
+            try:
+                row.created_time = datetime.fromtimestamp(float(value), tz=timezone.utc)
+                break
+            except (ValueError, OverflowError, OSError):
+                pass
+            try:
+                parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except ValueError:
+                continue
+            row.created_time = (
+                parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+            )
+            break
+        if row.created_time is not None:
+            batch.append(row)
+        if len(batch) >= 1000:
+            rows.bulk_update(batch, ["created_time"])
+            batch = []
+    if batch:
+        rows.bulk_update(batch, ["created_time"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cc_app", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="combineddata",
+            name="created_time",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="TopicTrendRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("day", "Day"), ("week", "Week"), ("month", "Month")],
+                        max_length=5,
+                    ),
+                ),
+                ("period_start", models.DateField()),
+                ("topic", models.CharField(max_length=200)),
+                ("state", models.CharField(max_length=100)),
+                ("count", models.IntegerField()),
+            ],
+            options={
+                "db_table": "topic_trend_rollups",
+                "indexes": [
+                    models.Index(
+                        fields=["period", "topic", "period_start"],
+                        name="topic_trend_period_febe40_idx",
+                    )
+                ],
+                "unique_together": {("period", "topic", "state", "period_start")},
+            },
+        ),
+        migrations.RunPython(backfill_created_time, migrations.RunPython.noop),
+    ]
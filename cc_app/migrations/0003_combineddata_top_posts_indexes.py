@@ -0,0 +1,27 @@
+# Generated by Django 5.1.5 on 2026-10-19 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cc_app", "0002_combineddata_created_time_topictrendrollup"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="combineddata",
+            index=models.Index(
+                fields=["state", "primary_label", "-score"],
+                name="cd_state_label_score_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="combineddata",
+            index=models.Index(
+                fields=["state", "primary_label", "-num_comments"],
+                name="cd_state_label_comments_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.1.5 on 2026-10-19 16:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cc_app", "0003_combineddata_top_posts_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "post",
+                    models.OneToOneField(
+                        db_column="row_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to="cc_app.combineddata",
+                    ),
+                ),
+                ("state", models.CharField(max_length=100)),
+                ("primary_label", models.CharField(max_length=100)),
+                ("length", models.IntegerField()),
+            ],
+            options={
+                "db_table": "search_documents",
+                "indexes": [
+                    models.Index(
+                        fields=["state", "primary_label"],
+                        name="search_docu_state_83c5bb_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="SearchPosting",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=100)),
+                ("term_frequency", models.IntegerField()),
+                (
+                    "document",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="postings",
+                        to="cc_app.searchdocument",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "search_postings",
+                "unique_together": {("term", "document")},
+            },
+        ),
+    ]
@@ -0,0 +1,128 @@
+# Generated by Django 5.1.5 on 2026-10-19 16:44
+
+import ast
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+COMMITTEE_SEPARATOR = re.compile(
+    r"\s*[;|\n]\s*|,\s*(?=(?:House|Senate|Joint|Select|Permanent|Special|Committee|Subcommittee)\b)"
+)
+
+
+def parse_committee_assignments(value):
+    # Copy of cc_app.models.parse_committee_assignments as of this migration
+    if isinstance(value, str) and value.strip().startswith("["):
+        try:
+            value = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            pass
+    names = (
+        value
+        if isinstance(value, (list, tuple))
+        else COMMITTEE_SEPARATOR.split(value or "")
+    )
+    committees = {}
+    for name in names:
+        name = " ".join(str(name).split()).strip(" ,;")
+        if name and name.lower() != "unknown" and len(name) <= 200:
+            committees.setdefault(name.lower(), name)
+    return list(committees.values())
+
+
+def backfill_committees(apps, schema_editor):
+    CongressMembers = apps.get_model("cc_app", "CongressMembers")
+    Committee = apps.get_model("cc_app", "Committee")
+    CommitteeMembership = apps.get_model("cc_app", "CommitteeMembership")
+    # Read from the database being migrated, not the router's read alias
+    alias = schema_editor.connection.alias
+    assignments = {
+        bioguide_id: parse_committee_assignments(value)
+        for bioguide_id, value in CongressMembers.objects.using(alias).values_list(
+            "bioguide_id", "committee_assignments"
+        )
+    }
+    names = {}
+    for committees in assignments.values():
+        for name in committees:
+            names.setdefault(name.lower(), name)
+    Committee.objects.using(alias).bulk_create(
+        [Committee(name=name) for name in names.values()]
+    )
+    ids = {
+        name.lower(): pk
+        for pk, name in Committee.objects.using(alias).values_list("id", "name")
+    }
+    CommitteeMembership.objects.using(alias).bulk_create(
+        [
+            CommitteeMembership(committee_id=ids[name.lower()], member_id=bioguide_id)
+            for bioguide_id, committees in assignments.items()
+            for name in committees
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cc_app", "0004_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Committee",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=200, unique=True)),
+            ],
+            options={
+                "db_table": "committees",
+            },
+        ),
+        migrations.CreateModel(
+            name="CommitteeMembership",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "committee",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="memberships",
+                        to="cc_app.committee",
+                    ),
+                ),
+                (
+                    "member",
+                    models.ForeignKey(
+                        db_column="bioguide_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="committee_memberships",
+                        to="cc_app.congressmembers",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "committee_memberships",
+                "unique_together": {("committee", "member")},
+            },
+        ),
+        migrations.RunPython(backfill_committees, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 5.1.5 on 2026-10-19 16:48
+
+import hashlib
+import json
+import zlib
+
+from django.db import migrations, models
+
+LAYER_MODELS = {"states": "USStateTopojson", "districts": "USDistrictTopojson"}
+
+
+def compress_topojson_versions(apps, schema_editor):
+    CurrentTopojson = apps.get_model("cc_app", "CurrentTopojson")
+    # Read from the database being migrated, not the router's read alias
+    alias = schema_editor.connection.alias
+    for layer, model_name in LAYER_MODELS.items():
+        model = apps.get_model("cc_app", model_name)
+        for row in model.objects.using(alias).filter(topojson__isnull=False).iterator():
+            # Same canonical encoding as topology_store.canonical_topology_bytes
+            body = json.dumps(
+                {**row.topojson, "type": "Topology"},
+                separators=(",", ":"),
+                sort_keys=True,
+            ).encode("utf-8")
+            row.compressed = zlib.compress(body, 9)
+            row.content_hash = hashlib.sha256(body).hexdigest()
+            row.size = len(body)
+            row.topojson = None
+            row.save(using=alias)
+        latest = model.objects.using(alias).order_by("-id").first()
+        if latest is not None:
+            CurrentTopojson.objects.using(alias).update_or_create(
+                layer=layer,
+                defaults={"version_id": latest.id, "content_hash": latest.content_hash},
+            )
+
+
+def decompress_topojson_versions(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    for model_name in LAYER_MODELS.values():
+        model = apps.get_model("cc_app", model_name)
+        for row in (
+            model.objects.using(alias).filter(compressed__isnull=False).iterator()
+        ):
+            row.topojson = json.loads(zlib.decompress(row.compressed))
+            row.save(using=alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cc_app", "0005_committees"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CurrentTopojson",
+            fields=[
+                (
+                    "layer",
+                    models.CharField(max_length=20, primary_key=True, serialize=False),
+                ),
+                ("version_id", models.IntegerField()),
+                ("content_hash", models.CharField(max_length=64)),
+            ],
+            options={
+                "db_table": "topojson_current",
+            },
+        ),
+        migrations.AddField(
+            model_name="usdistricttopojson",
+            name="compressed",
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AddField(
+            model_name="usdistricttopojson",
+            name="content_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="usdistricttopojson",
+            name="created_time",
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="usdistricttopojson",
+            name="size",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="usstatetopojson",
+            name="compressed",
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AddField(
+            model_name="usstatetopojson",
+            name="content_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="usstatetopojson",
+            name="created_time",
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="usstatetopojson",
+            name="size",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="usdistricttopojson",
+            name="topojson",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="usstatetopojson",
+            name="topojson",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.RunPython(compress_topojson_versions, decompress_topojson_versions),
+    ]
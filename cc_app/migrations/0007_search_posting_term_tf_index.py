@@ -0,0 +1,20 @@
+# Generated by Django 5.1.5 on 2026-10-19 17:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cc_app", "0006_topojson_versions"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="searchposting",
+            index=models.Index(
+                fields=["term", "-term_frequency"],
+                name="sp_term_tf_idx",
+            ),
+        ),
+    ]
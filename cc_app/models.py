@@ -1,8 +1,67 @@
+import ast
+import re
+from datetime import datetime, timezone
 from django.db import models
 
+# Commas also appear inside committee names ("Commerce, Science, and
+# Transportation"), so a comma only separates two names when the next one
+# starts like a committee name
+COMMITTEE_NAME_MAX_LENGTH = 200
+COMMITTEE_SEPARATOR = re.compile(r"\s*[;|\n]\s*|,\s*(?=(?:House|Senate|Joint|Select|Permanent|Special|Committee|Subcommittee)\b)")
+
+
+def parse_created_timestamp(*values):
+    """
+    Returns the first value that parses as a Unix epoch or ISO-8601 timestamp,
+    as an aware UTC datetime, or None if none of them parse.
+    """
+    for value in values:
+        if not value:
+            continue
+        value = str(value).strip()
+        try:
+            return datetime.fromtimestamp(float(value), tz=timezone.utc)
+        except (ValueError, OverflowError, OSError):
+            pass
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            continue
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed
+    return None
+
+
+def parse_committee_assignments(value):
+    """
+    Returns the committee names in a committee_assignments value, which may be
+    a list, a list literal or a delimited string. "Unknown", blanks and names
+    longer than COMMITTEE_NAME_MAX_LENGTH (an unsplit run of assignments,
+    which couldn't be stored) are dropped; names keep their first spelling.
+    """
+    if isinstance(value, str) and value.strip().startswith("["):
+        try:
+            value = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            pass
+    names = value if isinstance(value, (list, tuple)) else COMMITTEE_SEPARATOR.split(value or "")
+    committees = {}
+    for name in names:
+        name = " ".join(str(name).split()).strip(" ,;")
+        if name and name.lower() != "unknown" and len(name) <= COMMITTEE_NAME_MAX_LENGTH:
+            committees.setdefault(name.lower(), name)
+    return list(committees.values())
+
 # Create your models here
+# TopoJSON versions are stored as zlib-compressed canonical JSON (see
+# cc_app/topology_store.py); topojson is only set on rows from before that
 class USStateTopojson(models.Model):
-    topojson = models.JSONField()
+    topojson = models.JSONField(null=True, blank=True)
+    compressed = models.BinaryField(null=True)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    size = models.IntegerField(default=0)
+    created_time = models.DateTimeField(auto_now_add=True, null=True)
 
     class Meta:
         db_table = "us_states_topo"
@@ -11,7 +70,11 @@ class USStateTopojson(models.Model):
         return self.id
 
 class USDistrictTopojson(models.Model):
-    topojson = models.JSONField()
+    topojson = models.JSONField(null=True, blank=True)
+    compressed = models.BinaryField(null=True)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    size = models.IntegerField(default=0)
+    created_time = models.DateTimeField(auto_now_add=True, null=True)
 
     class Meta:
         db_table = "us_districts_topo"
@@ -19,6 +82,21 @@ class USDistrictTopojson(models.Model):
     def __str__(self):
         return self.id
 
+class CurrentTopojson(models.Model):
+    """
+    Points each layer ("states", "districts") at its current TopoJSON version,
+    so reads are a primary key lookup instead of latest("id").
+    """
+    layer = models.CharField(max_length=20, primary_key=True)
+    version_id = models.IntegerField()
+    content_hash = models.CharField(max_length=64)
+
+    class Meta:
+        db_table = "topojson_current"
+
+    def __str__(self):
+        return f"{self.layer} {self.version_id}"
+
 class CongressMembers(models.Model):
     bioguide_id = models.CharField(max_length=10, primary_key=True)
     name = models.CharField(max_length=100)
@@ -151,9 +229,101 @@ class CombinedData(models.Model):
     label_source = models.CharField(max_length=50)
     assigned_topics = models.CharField(max_length=200)
     confidence_score = models.FloatField()
+    created_time = models.DateTimeField(null=True, blank=True, db_index=True)
 
     class Meta:
         db_table = "combined_data"
+        indexes = [
+            models.Index(fields=["state", "primary_label", "-score"], name="cd_state_label_score_idx"),
+            models.Index(fields=["state", "primary_label", "-num_comments"], name="cd_state_label_comments_idx"),
+        ]
+
+    def __str__(self):
+        return self.row_id
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so a save that moves the row to another state or label
+        # can drop it from the old top posts lists (None if deferred)
+        instance._loaded_top_posts_group = (instance.__dict__.get("state"), instance.__dict__.get("primary_label"))
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Parse the string timestamps on every write so time ranges can use the
+        # index and an edited created_utc moves the row to its new period
+        self.created_time = parse_created_timestamp(self.created_utc, self.created_at) or self.created_time
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"created_utc", "created_at"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "created_time"}
+        super().save(*args, **kwargs)
+
+class TopicTrendRollup(models.Model):
+    PERIOD_CHOICES = [("day", "Day"), ("week", "Week"), ("month", "Month")]
+
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    topic = models.CharField(max_length=200)
+    state = models.CharField(max_length=100)
+    count = models.IntegerField()
+
+    class Meta:
+        db_table = "topic_trend_rollups"
+        unique_together = ("period", "topic", "state", "period_start")
+        indexes = [
+            models.Index(fields=["period", "topic", "period_start"]),
+        ]
+
+    def __str__(self):
+        return f"{self.period} {self.period_start} {self.topic} {self.state}"
+
+class SearchDocument(models.Model):
+    post = models.OneToOneField(CombinedData, primary_key=True, on_delete=models.CASCADE, db_column="row_id")
+    state = models.CharField(max_length=100)
+    primary_label = models.CharField(max_length=100)
+    length = models.IntegerField()
+
+    class Meta:
+        db_table = "search_documents"
+        indexes = [
+            models.Index(fields=["state", "primary_label"]),
+        ]
+
+    def __str__(self):
+        return str(self.post_id)
+
+class SearchPosting(models.Model):
+    term = models.CharField(max_length=100)
+    document = models.ForeignKey(SearchDocument, on_delete=models.CASCADE, related_name="postings")
+    term_frequency = models.IntegerField()
+
+    class Meta:
+        db_table = "search_postings"
+        unique_together = ("term", "document")
+        indexes = [
+            # Reads a term's highest-frequency postings first
+            models.Index(fields=["term", "-term_frequency"], name="sp_term_tf_idx"),
+        ]
+
+    def __str__(self):
+        return self.term
+
+class Committee(models.Model):
+    name = models.CharField(max_length=COMMITTEE_NAME_MAX_LENGTH, unique=True)
+
+    class Meta:
+        db_table = "committees"
+
+    def __str__(self):
+        return self.name
+
+class CommitteeMembership(models.Model):
+    committee = models.ForeignKey(Committee, on_delete=models.CASCADE, related_name="memberships")
+    member = models.ForeignKey(CongressMembers, on_delete=models.CASCADE, related_name="committee_memberships", db_column="bioguide_id")
+
+    class Meta:
+        db_table = "committee_memberships"
+        unique_together = ("committee", "member")
 
     def __str__(self):
-        return self.row_id
\ No newline at end of file
+        return f"{self.committee_id} {self.member_id}"
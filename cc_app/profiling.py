@@ -0,0 +1,212 @@
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+from .cache_codec import get_value, set_value
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_INDEX_KEY = "profiles:index"
+PROFILE_TIMEOUT = 7 * 24 * 3600
+TASK_PROFILE_KEY = "profile_task:{}"
+
+
+def profiler_setting(name, default):
+    return getattr(settings, name, default)
+
+
+def frame_label(frame):
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+
+class Profile:
+    """
+    Collapsed stack counts for one request or task. Forced profiles are
+    sampled from the start; the others only once they have run past the slow
+    threshold, so their samples cover the slow remainder.
+    """
+
+    def __init__(self, kind, name, forced, threshold):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.name = name
+        self.forced = forced
+        self.thread_id = threading.get_ident()
+        self.started = time.perf_counter()
+        self.sample_after = self.started if forced else self.started + threshold
+        self.stacks = Counter()
+
+    def add_sample(self, frame):
+        labels = []
+        while frame is not None:
+            labels.append(frame_label(frame))
+            frame = frame.f_back
+        self.stacks[";".join(reversed(labels))] += 1
+
+    def collapsed(self):
+        """
+        Returns the samples in the collapsed stack format ("a;b;c count" per
+        line) read by flamegraph.pl and speedscope.
+        """
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+class Sampler:
+    """
+    One background thread per process that, every interval, records the stack
+    of each thread with an active profile that is due for sampling. Requests
+    that finish under the threshold cost a dict insert and delete.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.active = {}
+        self.pid = None
+
+    def register(self, profile):
+        with self.lock:
+            # Started lazily and restarted after a fork, since threads don't survive one
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                threading.Thread(target=self.run, name="profiler-sampler", daemon=True).start()
+            self.active[profile.thread_id] = profile
+
+    def unregister(self, profile):
+        with self.lock:
+            if self.active.get(profile.thread_id) is profile:
+                del self.active[profile.thread_id]
+
+    def run(self):
+        pid = os.getpid()
+        while self.pid == pid:
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            # Sampled under the lock so unregister waits for an in-flight
+            # sample; finish_profile then reads stacks with no writer left
+            with self.lock:
+                due = [profile for profile in self.active.values() if now >= profile.sample_after]
+                if not due:
+                    continue
+                frames = sys._current_frames()
+                for profile in due:
+                    frame = frames.get(profile.thread_id)
+                    if frame is not None:
+                        profile.add_sample(frame)
+
+
+_sampler = None
+
+def get_sampler():
+    global _sampler
+    if _sampler is None:
+        _sampler = Sampler(profiler_setting("PROFILER_INTERVAL_MS", 10) / 1000)
+    return _sampler
+
+
+def start_profile(kind, name, forced=False):
+    """
+    Starts profiling the current thread if it was forced (admin header or
+    armed task), picked by PROFILER_SAMPLE_RATE, or PROFILER_SLOW_THRESHOLD_MS
+    is set. Returns the Profile, or None if this run isn't profiled.
+    """
+    forced = forced or random.random() < profiler_setting("PROFILER_SAMPLE_RATE", 0)
+    threshold = profiler_setting("PROFILER_SLOW_THRESHOLD_MS", 0) / 1000
+    if not forced and not threshold:
+        return None
+    profile = Profile(kind, name, forced, threshold)
+    get_sampler().register(profile)
+    return profile
+
+
+def finish_profile(profile):
+    """
+    Stops a profile and stores it if it was forced or ran past the slow
+    threshold.
+
+    Returns:
+        str: The stored profile id, or None if nothing was stored.
+    """
+    get_sampler().unregister(profile)
+    duration = time.perf_counter() - profile.started
+    # Unforced profiles only have samples once past the threshold
+    if not profile.stacks:
+        return None
+    store_profile(profile, duration)
+    return profile.id
+
+
+def store_profile(profile, duration):
+    """
+    Stores the collapsed stacks and prepends their metadata to the profile
+    index, keeping the newest PROFILER_MAX_STORED. The index update is a plain
+    read-modify-write, so concurrent stores may occasionally drop an entry.
+    """
+    set_value(f"profile:{profile.id}", profile.collapsed(), timeout=PROFILE_TIMEOUT)
+    entry = {
+        "id": profile.id,
+        "kind": profile.kind,
+        "name": profile.name,
+        "duration_ms": round(duration * 1000, 1),
+        "samples": sum(profile.stacks.values()),
+        "forced": profile.forced,
+        "created": time.time(),
+    }
+    index = cache.get(PROFILE_INDEX_KEY) or []
+    cache.set(PROFILE_INDEX_KEY, [entry, *index][:profiler_setting("PROFILER_MAX_STORED", 50)], timeout=PROFILE_TIMEOUT)
+    print(f"Stored profile {profile.id} for {profile.kind} {profile.name} ({entry['duration_ms']} ms, {entry['samples']} samples)")
+
+
+def list_profiles():
+    return cache.get(PROFILE_INDEX_KEY) or []
+
+
+def get_profile(profile_id):
+    """
+    Returns the collapsed stacks of a stored profile, or None if it expired.
+    """
+    return get_value(f"profile:{profile_id}")
+
+
+def arm_task_profile(task_name):
+    """
+    Profiles the next run of a task regardless of sample rate or threshold.
+    """
+    cache.set(TASK_PROFILE_KEY.format(task_name), True, timeout=24 * 3600)
+
+
+def take_task_profile_flag(task_name):
+    key = TASK_PROFILE_KEY.format(task_name)
+    if cache.get(key):
+        cache.delete(key)
+        return True
+    return False
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests picked by the sample rate or slow threshold, and any
+    request from a staff user carrying an "X-Profile: 1" header. The id of a
+    stored profile is returned in the X-Profile-Id response header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = request.META.get(PROFILE_HEADER) == "1" and getattr(request, "user", None) is not None and request.user.is_staff
+        profile = start_profile("request", f"{request.method} {request.path}", forced=requested)
+        if profile is None:
+            return self.get_response(request)
+
+        try:
+            response = self.get_response(request)
+        finally:
+            profile_id = finish_profile(profile)
+        if profile_id:
+            response["X-Profile-Id"] = profile_id
+        return response
@@ -0,0 +1,19 @@
+import json
+from rest_framework.renderers import BaseRenderer
+
+
+class GeoJSONRenderer(BaseRenderer):
+    """
+    Renders GeoJSON responses. Payloads that were encoded ahead of time are
+    passed through as bytes; anything else (e.g. error messages) is JSON encoded.
+    """
+    media_type = "application/geo+json"
+    format = "geojson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if isinstance(data, bytes):
+            return data
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
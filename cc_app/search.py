@@ -0,0 +1,149 @@
+import math
+import re
+from collections import Counter
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count
+from .models import CombinedData, SearchDocument, SearchPosting
+from .utils import TOP_POSTS_FIELDS, post_summary
+
+# Standard BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+SEARCH_STATS_CACHE_KEY = "search_index_stats"
+SEARCH_INDEX_QUEUED_KEY = "search_index:queued"
+# Postings scored per query term, highest term frequency first
+SEARCH_MAX_POSTINGS_PER_TERM = 5000
+SEARCH_MAX_QUERY_TERMS = 10
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """
+    Splits text into lowercase alphanumeric terms, dropping single characters
+    and anything too long to store as a posting term.
+    """
+    return [token for token in TOKEN_PATTERN.findall((text or "").lower()) if 1 < len(token) <= 100]
+
+
+def document_terms(row):
+    """
+    Returns the term frequencies of a combined_data row's lemmatized title and text.
+    """
+    return Counter(tokenize(row.title_lemmatized) + tokenize(row.selftext_lemmatized))
+
+
+def build_postings(row, terms):
+    document = SearchDocument(post_id=row.row_id, state=row.state, primary_label=row.primary_label, length=sum(terms.values()))
+    postings = [SearchPosting(term=term, document_id=row.row_id, term_frequency=tf) for term, tf in terms.items()]
+    return document, postings
+
+
+def index_post(row):
+    """
+    Replaces the postings of a single combined_data row. Called on ingest so the
+    index stays current without a rebuild.
+    """
+    document, postings = build_postings(row, document_terms(row))
+    with transaction.atomic():
+        SearchDocument.objects.filter(post_id=row.row_id).delete()
+        document.save()
+        SearchPosting.objects.bulk_create(postings)
+    cache.delete(SEARCH_STATS_CACHE_KEY)
+
+
+def rebuild_search_index(batch_size=1000):
+    """
+    Rebuilds the inverted index over every combined_data row.
+
+    Returns:
+        int: Number of documents indexed.
+    """
+    fields = ("row_id", "state", "primary_label", "title_lemmatized", "selftext_lemmatized")
+    indexed = 0
+    documents, postings = [], []
+
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        for row in CombinedData.objects.only(*fields).iterator(chunk_size=batch_size):
+            document, row_postings = build_postings(row, document_terms(row))
+            documents.append(document)
+            postings.extend(row_postings)
+            if len(documents) >= batch_size:
+                SearchDocument.objects.bulk_create(documents)
+                SearchPosting.objects.bulk_create(postings, batch_size=batch_size)
+                indexed += len(documents)
+                documents, postings = [], []
+        if documents:
+            SearchDocument.objects.bulk_create(documents)
+            SearchPosting.objects.bulk_create(postings, batch_size=batch_size)
+            indexed += len(documents)
+
+    cache.delete_many([SEARCH_STATS_CACHE_KEY, SEARCH_INDEX_QUEUED_KEY])
+    print(f"Indexed {indexed} posts for search.")
+    return indexed
+
+
+def get_index_stats():
+    """
+    Returns the document count and average document length used by BM25.
+    """
+    stats = cache.get(SEARCH_STATS_CACHE_KEY)
+    if stats is None:
+        stats = SearchDocument.objects.aggregate(count=Count("post_id"), avg_length=Avg("length"))
+        stats["avg_length"] = stats["avg_length"] or 0
+        cache.set(SEARCH_STATS_CACHE_KEY, stats, timeout=14400)
+    return stats
+
+
+def search_posts(query, state=None, topic=None, limit=20):
+    """
+    Returns combined_data posts matching the query ranked by BM25. Only the
+    postings of the query terms are read, restricted by the optional state and
+    topic (primary label, case-insensitive) filters, and at most
+    SEARCH_MAX_POSTINGS_PER_TERM of them per term, highest term frequency
+    first, so common terms don't score every document that contains them.
+    Only the first SEARCH_MAX_QUERY_TERMS distinct terms are used.
+    Returns None if the index hasn't been built yet; it is built by the
+    rebuild_search_index command or task, never here.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))[:SEARCH_MAX_QUERY_TERMS]
+    if not terms:
+        return []
+    if not SearchDocument.objects.exists():
+        return None
+
+    stats = get_index_stats()
+    if not stats["count"]:
+        return []
+
+    # Document frequencies are global so filters do not change term weights
+    document_frequencies = dict(
+        SearchPosting.objects.filter(term__in=terms).values_list("term").annotate(df=Count("id"))
+    )
+
+    postings = SearchPosting.objects.all()
+    if state:
+        postings = postings.filter(document__state=state)
+    if topic:
+        postings = postings.filter(document__primary_label__iexact=topic)
+
+    scores = Counter()
+    for term, df in document_frequencies.items():
+        idf = math.log(1 + (stats["count"] - df + 0.5) / (df + 0.5))
+        term_postings = (
+            postings.filter(term=term)
+            .order_by("-term_frequency")
+            .values_list("document_id", "term_frequency", "document__length")[:SEARCH_MAX_POSTINGS_PER_TERM]
+        )
+        for document_id, tf, length in term_postings:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (stats["avg_length"] or 1))
+            scores[document_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+    ranked = scores.most_common(limit)
+    posts = CombinedData.objects.only(*TOP_POSTS_FIELDS).in_bulk([document_id for document_id, _ in ranked])
+    return [
+        {**post_summary(posts[document_id]), "relevance": round(relevance, 4)}
+        for document_id, relevance in ranked
+        if document_id in posts
+    ]
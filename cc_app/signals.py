@@ -0,0 +1,118 @@
+from celery.signals import task_prerun, task_postrun
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import CombinedData, CongressMembers, CongressMembersWithProportions
+from .utils import update_top_posts_cache, invalidate_top_posts_cache, invalidate_dashboard_bootstrap, invalidate_topic_list_for
+from .utils import invalidate_confidence_index, invalidate_engagement_histograms
+from .utils import invalidate_cached_object, invalidate_member_stats, MEMBER_CACHE_PREFIX, MEMBER_PROPORTIONS_CACHE_PREFIX
+from .search import index_post, SEARCH_STATS_CACHE_KEY
+from .committees import sync_member_committees, invalidate_committee_index
+from .snapshots import invalidate_snapshots
+from .analytics import invalidate_analytics_snapshot, ANALYTICS_SNAPSHOT_QUEUED_KEY
+from .tasks import refresh_analytics_snapshot
+from .db_routers import use_primary
+from .profiling import start_profile, finish_profile, take_task_profile_flag
+
+# Celery task id -> Profile for cc_app tasks being profiled in this worker
+_task_profiles = {}
+# Celery task id -> use_primary token to reset when the task finishes
+_task_primary_tokens = {}
+
+
+def queue_analytics_snapshot_build():
+    # Again at commit, so a build that read the generation before then is stale too
+    invalidate_analytics_snapshot()
+    if cache.add(ANALYTICS_SNAPSHOT_QUEUED_KEY, True, timeout=600):
+        refresh_analytics_snapshot.delay()
+
+
+def mark_analytics_snapshot_stale():
+    """
+    Stops serving the analytics snapshot and queues one rebuild, sent after
+    the write commits so the build reads it.
+    """
+    invalidate_analytics_snapshot()
+    transaction.on_commit(queue_analytics_snapshot_build)
+
+
+@receiver(post_save, sender=CombinedData)
+def combined_data_saved(sender, instance, **kwargs):
+    """
+    Keeps the cached per-(state, topic) top posts and the search index current
+    as rows are ingested.
+    """
+    update_top_posts_cache(instance)
+    index_post(instance)
+    invalidate_topic_list_for(instance)
+    invalidate_confidence_index()
+    invalidate_engagement_histograms()
+    mark_analytics_snapshot_stale()
+    invalidate_snapshots()
+
+
+@receiver(post_delete, sender=CombinedData)
+def combined_data_deleted(sender, instance, **kwargs):
+    invalidate_top_posts_cache(instance)
+    cache.delete(SEARCH_STATS_CACHE_KEY)
+    invalidate_confidence_index()
+    invalidate_engagement_histograms()
+    mark_analytics_snapshot_stale()
+    invalidate_snapshots()
+
+
+@receiver(post_save, sender=CongressMembers)
+def congress_member_saved(sender, instance, **kwargs):
+    """
+    Parses committee_assignments into committee memberships on write, and
+    drops the member's cached row, the member list and stats, and the
+    dashboard bootstrap that embeds the list.
+    """
+    sync_member_committees(instance)
+    invalidate_cached_object(MEMBER_CACHE_PREFIX, instance.pk)
+    invalidate_member_stats()
+    invalidate_dashboard_bootstrap("congress_members")
+    invalidate_snapshots()
+
+
+@receiver(post_delete, sender=CongressMembers)
+def congress_member_deleted(sender, instance, **kwargs):
+    invalidate_committee_index()
+    invalidate_cached_object(MEMBER_CACHE_PREFIX, instance.pk)
+    invalidate_member_stats()
+    invalidate_dashboard_bootstrap("congress_members")
+    invalidate_snapshots()
+
+
+@receiver([post_save, post_delete], sender=CongressMembersWithProportions)
+def member_proportions_changed(sender, instance, **kwargs):
+    invalidate_cached_object(MEMBER_PROPORTIONS_CACHE_PREFIX, instance.pk)
+    invalidate_member_stats()
+    invalidate_dashboard_bootstrap("congress_members_with_proportions")
+    invalidate_snapshots()
+
+
+@task_prerun.connect
+def task_started(sender=None, task_id=None, task=None, **kwargs):
+    """
+    Routes cc_app.tasks reads to the primary, and profiles runs picked by the
+    sample rate or slow threshold or armed from the profiles API.
+    """
+    if not task.name.startswith("cc_app.tasks."):
+        return
+    # Tasks rebuild derived data from what they just wrote; keep them off the replica
+    _task_primary_tokens[task_id] = use_primary.set(True)
+    profile = start_profile("task", task.name, forced=take_task_profile_flag(task.name))
+    if profile is not None:
+        _task_profiles[task_id] = profile
+
+
+@task_postrun.connect
+def task_finished(sender=None, task_id=None, **kwargs):
+    token = _task_primary_tokens.pop(task_id, None)
+    if token is not None:
+        use_primary.reset(token)
+    profile = _task_profiles.pop(task_id, None)
+    if profile is not None:
+        finish_profile(profile)
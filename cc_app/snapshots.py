@@ -0,0 +1,180 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.urls import reverse
+from django.utils.text import slugify
+from .geo import get_geojson_payload, build_geojson_payloads
+from .models import CongressMembers, CongressMembersWithProportions
+from .topology_store import get_current_topology_bytes
+from .utils import get_ideology_topics, get_ideology_data_for_topic, get_dashboard_bootstrap
+
+SNAPSHOT_DIRNAME = "snapshots"
+MANIFEST_FILENAME = "manifest.json"
+SNAPSHOT_VERSION_KEY = "snapshots:version"
+SNAPSHOT_FILENAME = re.compile(r"^[a-z0-9_-]+\.[0-9a-f]{12}\.json$")
+
+
+def snapshot_dir():
+    return os.path.join(settings.STATIC_ROOT, SNAPSHOT_DIRNAME)
+
+
+def encode(value):
+    if isinstance(value, bytes):
+        return value
+    return json.dumps(value, cls=DjangoJSONEncoder, separators=(",", ":")).encode("utf-8")
+
+
+def current_topojson(layer):
+    """
+    Returns the current TopoJSON bytes as the API serves them, or None.
+    """
+    current = get_current_topology_bytes(layer)
+    return current[1] if current else None
+
+
+def current_geojson(layer):
+    """
+    Returns the layer's national GeoJSON, building it first if it isn't
+    cached, or None if no TopoJSON is stored.
+    """
+    payload = get_geojson_payload(layer)
+    if payload is None:
+        build_geojson_payloads(layer)
+        payload = get_geojson_payload(layer)
+    return payload or None
+
+
+def collect_snapshots():
+    """
+    Returns snapshot name -> response body for every read-only API response
+    that only changes when new data is loaded. Names match the API cache keys.
+    """
+    snapshots = {
+        "us_states_topojson": current_topojson("states"),
+        "us_districts_topojson": current_topojson("districts"),
+        "us_states_geojson": current_geojson("states"),
+        "us_districts_geojson": current_geojson("districts"),
+        "congress_members": list(CongressMembers.objects.values()),
+        "member_proportions": list(CongressMembersWithProportions.objects.values()),
+        "ideology_topics": get_ideology_topics(),
+    }
+    for topic in snapshots["ideology_topics"] or []:
+        snapshots[f"ideology_topic:{topic}"] = get_ideology_data_for_topic(topic)
+    bootstrap = get_dashboard_bootstrap()
+    snapshots["dashboard_bootstrap"] = bootstrap[1] if bootstrap else None
+
+    return {name: encode(body) for name, body in snapshots.items() if body is not None}
+
+
+def snapshot_path(filename):
+    """
+    Returns the path of a published snapshot file, or None if the name isn't
+    a snapshot filename or the file doesn't exist.
+    """
+    if not SNAPSHOT_FILENAME.match(filename):
+        return None
+    path = os.path.join(snapshot_dir(), filename)
+    return path if os.path.exists(path) else None
+
+
+def manifest_version(manifest):
+    return hashlib.md5(json.dumps(manifest, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def invalidate_snapshots():
+    """
+    Called when members, posts or TopoJSON change. Every host stops using its
+    manifest, so pages load from the API until publish_snapshots runs again.
+    """
+    cache.delete(SNAPSHOT_VERSION_KEY)
+
+
+def publish_snapshots():
+    """
+    Writes every snapshot to STATIC_ROOT/snapshots as <name>.<hash>.json plus a
+    gzipped copy, served by the snapshot_file view, then replaces manifest.json
+    and publishes its version in the cache. Files referenced by neither the new nor the previous manifest are
+    removed, so pages holding the previous manifest keep working until their
+    next load.
+
+    Returns:
+        dict: snapshot name -> URL, as written to the manifest.
+    """
+    directory = snapshot_dir()
+    os.makedirs(directory, exist_ok=True)
+    previous = read_manifest_files(directory)
+
+    manifest = {}
+    written = set()
+    for name, body in collect_snapshots().items():
+        # 12 hex characters, as SNAPSHOT_FILENAME expects
+        filename = f"{slugify(name.replace(':', '-'))}.{hashlib.md5(body).hexdigest()[:12]}.json"
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(body)
+            with gzip.open(f"{path}.gz", "wb", compresslevel=9) as f:
+                f.write(body)
+        # Served by the snapshot_file view rather than the static files
+        # handler, which only sees files that existed when the process started
+        manifest[name] = reverse("snapshot_file", args=[filename])
+        written.add(filename)
+
+    manifest_path = os.path.join(directory, MANIFEST_FILENAME)
+    with open(f"{manifest_path}.tmp", "w") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    cache.set(SNAPSHOT_VERSION_KEY, manifest_version(manifest), timeout=None)
+
+    keep = written | previous
+    for filename in os.listdir(directory):
+        if filename != MANIFEST_FILENAME and filename.removesuffix(".gz") not in keep:
+            os.remove(os.path.join(directory, filename))
+
+    return manifest
+
+
+def read_manifest_files(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_FILENAME)) as f:
+            return {url.rsplit("/", 1)[-1] for url in json.load(f).values()}
+    except (OSError, ValueError):
+        return set()
+
+
+_manifest = None
+_manifest_mtime = None
+_manifest_version = None
+
+def get_snapshot_manifest():
+    """
+    Returns the published snapshot manifest (name -> URL), re-reading the file
+    only when it changes. Returns {} if nothing has been published, or if this
+    host's manifest isn't the version last published (the data changed since,
+    or another host published newer data).
+    """
+    global _manifest, _manifest_mtime, _manifest_version
+
+    path = os.path.join(snapshot_dir(), MANIFEST_FILENAME)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+
+    if mtime != _manifest_mtime:
+        try:
+            with open(path) as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        _manifest_mtime = mtime
+        _manifest_version = manifest_version(_manifest)
+
+    if cache.get(SNAPSHOT_VERSION_KEY) != _manifest_version:
+        return {}
+    return _manifest
@@ -11,10 +11,11 @@ let allDistricts = null;  // Store full districts data in memory
 let cachedDistricts = {};  // Cache for district data by state (in-memory only)
 let stateDistricts = [];  // Store districts of the currently selected state
 
-// Geometry API Endpoints (same as your original Django endpoints)
+// Geometry API Endpoints: the server converts the TopoJSON to GeoJSON once,
+// so the browser can hand the feature collections straight to Plotly.
 const GEO_APIS = {
-  STATES: "/api/us_states_topojson/",
-  DISTRICTS: "/api/us_districts_topojson/"
+  STATES: "/api/us_states_topojson/?format=geojson",
+  DISTRICTS: "/api/us_districts_topojson/?format=geojson"
 };
 
 // 1. Fetch data from API: no localStorage calls, so you rely on server-side caching.
@@ -34,12 +35,14 @@ async function fetchGeoData(apiUrl) {
   }
 }
 
-// 2. Load states & districts; data is already cached on the server (e.g. Redis).
+// 2. Load states & districts; prefer the dashboard bootstrap payload and fall
+//    back to the individual endpoints (data is cached on the server either way).
 async function loadMapData() {
   try {
+    const bootstrap = await window.dashboardBootstrap;
     const [loadedStates, loadedDistricts] = await Promise.all([
-      fetchGeoData(GEO_APIS.STATES),
-      fetchGeoData(GEO_APIS.DISTRICTS)
+      bootstrap?.states || fetchGeoData(GEO_APIS.STATES),
+      bootstrap?.districts || fetchGeoData(GEO_APIS.DISTRICTS)
     ]);
 
     if (!loadedStates || !loadedDistricts) {
@@ -47,9 +50,8 @@ async function loadMapData() {
       return;
     }
 
-    // Convert JSON to GeoJSON
-    states = topojson.feature(loadedStates, loadedStates.objects.us_states);
-    allDistricts = topojson.feature(loadedDistricts, loadedDistricts.objects.congressional_districts);
+    states = loadedStates;
+    allDistricts = loadedDistricts;
 
     console.log("Loaded states and districts:", states, allDistricts);
     initPlotlyMap();
@@ -8,10 +8,13 @@ const IDEOLOGY_API = "/api/ideology_data_by_topic/";
 // Function to fetch data from API with caching
 async function fetchIdeologyTopics() {
     try {
-        const response = await fetch(TOPICS_API);
-        if (!response.ok) throw new Error("Failed to fetch data.");
-
-        const topics = await response.json();
+        const bootstrap = await window.dashboardBootstrap;
+        let topics = bootstrap?.ideology_topics;
+        if (!topics) {
+            const response = await fetch(TOPICS_API);
+            if (!response.ok) throw new Error("Failed to fetch data.");
+            topics = await response.json();
+        }
         window.ideologyTopics = topics;
         console.log("Fetched topics:", topics);
         return topics;
@@ -47,7 +50,12 @@ async function loadIdeologyChart() {
         }
 
         try {
-            const response = await fetch(`${IDEOLOGY_API}${encodeURIComponent(selectedTopic)}`);
+            // Prefer the published static snapshot for this topic when there is one
+            const snapshotUrl = window.dashboardSnapshots?.[`ideology_topic:${selectedTopic}`];
+            const apiUrl = `${IDEOLOGY_API}${encodeURIComponent(selectedTopic)}`;
+            let response = await fetch(snapshotUrl || apiUrl).catch(() => null);
+            // Fall back to the API if the snapshot has gone away since the page loaded
+            if (snapshotUrl && !response?.ok) response = await fetch(apiUrl);
             if (response.status === 202) {
                 updateIdeologyChart([], false, "Data is being fetched. Please wait...");
                 return;
@@ -22,12 +22,16 @@ function formatDistrict(num) {
 // Function to fetch Congress members from the server (no localStorage usage).
 async function fetchCongressMembers() {
   try {
-    console.log("Fetching new Congress members data from API (Redis caching is on the server)...");
-    const response = await fetch(MEMBERS_API);
-    if (!response.ok) {
-      throw new Error("Failed to fetch Congress members data");
+    const bootstrap = await window.dashboardBootstrap;
+    let data = bootstrap?.congress_members;
+    if (!data) {
+      console.log("Fetching new Congress members data from API (Redis caching is on the server)...");
+      const response = await fetch(MEMBERS_API);
+      if (!response.ok) {
+        throw new Error("Failed to fetch Congress members data");
+      }
+      data = await response.json();
     }
-    const data = await response.json();
     window.membersData = data;
     membersData = data; // Keep a top-level reference if desired
     return data;
@@ -190,10 +190,13 @@ function updateRadarChart(memberId) {
 // DOMContentLoaded: Setup and Wiring
 // ------------------------------
 document.addEventListener("DOMContentLoaded", function() {
-  fetch("/api/member_proportions/")
-    .then(response => {
-        if (!response.ok) throw new Error("Failed to fetch API data.");
-        return response.json();
+  Promise.resolve(window.dashboardBootstrap)
+    .then(bootstrap => {
+        if (bootstrap?.member_proportions) return bootstrap.member_proportions;
+        return fetch("/api/member_proportions/").then(response => {
+            if (!response.ok) throw new Error("Failed to fetch API data.");
+            return response.json();
+        });
     })
     .then(apiData => {
         globalMembersData = apiData;
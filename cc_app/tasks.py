@@ -1,5 +1,11 @@
 from celery import shared_task
-from .utils import get_ideology_data_for_topic, get_ideology_topics
+from django.core.cache import cache
+from .utils import get_ideology_data_for_topic, get_ideology_topics, build_confidence_index, rebuild_topic_trend_rollups
+from .utils import build_engagement_histograms
+from .search import rebuild_search_index
+from .committees import rebuild_committees
+from .analytics import build_analytics_snapshot
+from .geo import build_geojson_payloads, GEOJSON_LAYERS, GEOJSON_QUEUED_KEY
 
 
 @shared_task
@@ -16,4 +22,71 @@ def fetch_ideology_topics():
     Celery task to fetch or refresh the cache for the list of topics.
     This runs the same logic used in views.py but offloads it to the background.
     """
-    return get_ideology_topics()
\ No newline at end of file
+    return get_ideology_topics()
+
+@shared_task
+def refresh_confidence_index():
+    """
+    Celery task to rebuild the cached confidence index used by the
+    min_confidence / label_source ideology filters.
+    """
+    build_confidence_index()
+    return True
+
+
+@shared_task
+def refresh_topic_trend_rollups():
+    """
+    Celery task to recompute the day / week / month topic trend rollups
+    after new combined_data rows are loaded.
+    """
+    return rebuild_topic_trend_rollups()
+
+
+@shared_task
+def refresh_search_index():
+    """
+    Celery task to rebuild the full-text search index, e.g. after a bulk load
+    that bypassed model saves.
+    """
+    return rebuild_search_index()
+
+
+@shared_task
+def refresh_analytics_snapshot():
+    """
+    Celery task to write a new analytics snapshot after combined_data changes.
+    Workers on the same host pick it up on their next aggregation request.
+    """
+    return build_analytics_snapshot()
+
+
+
+@shared_task
+def refresh_engagement_histograms():
+    """
+    Celery task to recompute the per-(topic, state) engagement histograms
+    after new combined_data rows are loaded.
+    """
+    return len(build_engagement_histograms())
+
+
+
+@shared_task
+def refresh_geojson_payloads():
+    """
+    Celery task to rebuild the GeoJSON variants of both TopoJSON layers when
+    their cached payloads are missing.
+    """
+    built = sum(len(build_geojson_payloads(layer)) for layer in GEOJSON_LAYERS)
+    cache.delete(GEOJSON_QUEUED_KEY)
+    return built
+
+
+@shared_task
+def refresh_committees():
+    """
+    Celery task to rebuild committee memberships from committee_assignments,
+    e.g. after a bulk load of congress_members.
+    """
+    return rebuild_committees()
@@ -0,0 +1,234 @@
+import codecs
+import hashlib
+import json
+import zlib
+from django.conf import settings
+from django.db import transaction
+from .cache_codec import get_value, set_value
+from .models import USStateTopojson, USDistrictTopojson, CurrentTopojson
+
+TOPOLOGY_LAYERS = {
+    "states": {"model": USStateTopojson, "object": "us_states"},
+    "districts": {"model": USDistrictTopojson, "object": "congressional_districts"},
+}
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def topology_cache_key(layer):
+    # Not the old us_<layer>_topojson API keys, which hold a decoded topology
+    # rather than (content_hash, bytes) until they expire
+    return f"topojson_bytes:{layer}"
+
+
+def read_topology_upload(stream, layer, max_bytes=None):
+    """
+    Reads a TopoJSON upload from a request stream or uploaded file in chunks,
+    rejecting it as soon as it passes max_bytes instead of buffering the rest.
+    This only caps the size: the body is not parsed incrementally but with one
+    json.loads once fully read, so memory peaks at roughly the upload plus its
+    decoded objects. The body may be the topology itself or {"topojson": topology}.
+
+    Raises:
+        ValueError: If the upload is too large, not JSON or not a valid topology.
+    """
+    if stream is None:
+        raise ValueError("Upload is empty.")
+    max_bytes = max_bytes or getattr(settings, "TOPOJSON_MAX_UPLOAD_BYTES", 100 * 1024 * 1024)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parts = []
+    size = 0
+    try:
+        while chunk := stream.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise ValueError(f"Upload is larger than {max_bytes} bytes.")
+            parts.append(decoder.decode(chunk))
+        parts.append(decoder.decode(b"", final=True))
+    except UnicodeDecodeError:
+        raise ValueError("Upload is not UTF-8 encoded.")
+    return parse_topology_text("".join(parts), layer)
+
+
+def read_topology_form(value, layer, max_bytes=None):
+    """
+    Reads the topojson field of a form-encoded or multipart upload, which may
+    be the topology as a JSON string or an uploaded file.
+
+    Raises:
+        ValueError: If the field is missing, too large or not a valid topology.
+    """
+    if value is None:
+        raise ValueError("The form must have a topojson field.")
+    if hasattr(value, "read"):
+        return read_topology_upload(value, layer, max_bytes)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("Upload is empty.")
+    max_bytes = max_bytes or getattr(settings, "TOPOJSON_MAX_UPLOAD_BYTES", 100 * 1024 * 1024)
+    if len(value.encode("utf-8")) > max_bytes:
+        raise ValueError(f"Upload is larger than {max_bytes} bytes.")
+    return parse_topology_text(value, layer)
+
+
+def parse_topology_text(text, layer):
+    """
+    Parses and validates an upload body, unwrapping {"topojson": topology}.
+    """
+    if not text.strip():
+        raise ValueError("Upload is empty.")
+    try:
+        payload = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Upload is not valid JSON: {e}")
+
+    if isinstance(payload, dict) and "topojson" in payload:
+        payload = payload["topojson"]
+    validate_topology(payload, layer)
+    return payload
+
+
+def validate_topology(topology, layer):
+    """
+    Checks the structure every reader relies on: an arcs list, the layer's
+    GeometryCollection object, and geometries whose rings are lists of arc
+    indexes in range. Raises ValueError for anything else.
+    """
+    if not isinstance(topology, dict):
+        raise ValueError("TopoJSON must be an object.")
+    if topology.get("type", "Topology") != "Topology":
+        raise ValueError("TopoJSON type must be 'Topology'.")
+    arcs = topology.get("arcs")
+    if not isinstance(arcs, list) or not all(isinstance(arc, list) for arc in arcs):
+        raise ValueError("TopoJSON must have an arcs list of point lists.")
+    transform = topology.get("transform")
+    if transform is not None and not (
+        isinstance(transform, dict)
+        and isinstance(transform.get("scale"), list) and len(transform["scale"]) == 2
+        and isinstance(transform.get("translate"), list) and len(transform["translate"]) == 2
+    ):
+        raise ValueError("TopoJSON transform must have two-element scale and translate.")
+
+    object_name = TOPOLOGY_LAYERS[layer]["object"]
+    objects = topology.get("objects")
+    layer_object = objects.get(object_name) if isinstance(objects, dict) else None
+    geometries = layer_object.get("geometries") if isinstance(layer_object, dict) else None
+    if not isinstance(geometries, list):
+        raise ValueError(f"TopoJSON must have a '{object_name}' object with a geometries list.")
+
+    for position, geometry in enumerate(geometries):
+        if not isinstance(geometry, dict):
+            raise ValueError(f"Geometry {position} must be an object.")
+        if geometry.get("properties") is not None and not isinstance(geometry["properties"], dict):
+            raise ValueError(f"Geometry {position} properties must be an object.")
+        geometry_arcs = geometry.get("arcs", [])
+        if geometry.get("type") == "Polygon":
+            polygons = [geometry_arcs]
+        elif geometry.get("type") == "MultiPolygon":
+            if not isinstance(geometry_arcs, list):
+                raise ValueError(f"Geometry {position} arcs must be a list of polygons.")
+            polygons = geometry_arcs
+        else:
+            continue
+        for polygon in polygons:
+            if not isinstance(polygon, list) or not all(isinstance(ring, list) for ring in polygon):
+                raise ValueError(f"Geometry {position} arcs must be lists of rings of arc indexes.")
+            for ring in polygon:
+                for index in ring:
+                    if not isinstance(index, int) or isinstance(index, bool) or not -len(arcs) <= index < len(arcs):
+                        raise ValueError(f"Geometry {position} references arc {index!r}, but there are {len(arcs)} arcs.")
+
+
+def canonical_topology_bytes(topology):
+    """
+    Returns the topology as served by the API: compact JSON with sorted keys,
+    so the same content always has the same bytes and hash.
+    """
+    return json.dumps({**topology, "type": "Topology"}, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+def store_topology(layer, topology):
+    """
+    Stores a validated topology as a new compressed version, or reuses the
+    version with the same content hash, points the layer at it and prunes old
+    versions.
+
+    Returns:
+        tuple: (version, created)
+    """
+    model = TOPOLOGY_LAYERS[layer]["model"]
+    body = canonical_topology_bytes(topology)
+    content_hash = hashlib.sha256(body).hexdigest()
+
+    with transaction.atomic():
+        version = model.objects.filter(content_hash=content_hash).only("id", "content_hash", "size").first()
+        created = version is None
+        if created:
+            version = model.objects.create(compressed=zlib.compress(body, 9), content_hash=content_hash, size=len(body))
+        CurrentTopojson.objects.update_or_create(
+            layer=layer, defaults={"version_id": version.id, "content_hash": content_hash}
+        )
+        prune_topology_versions(layer)
+
+    set_value(topology_cache_key(layer), (content_hash, body))
+    print(f"Stored {layer} TopoJSON version {version.id} ({len(body)} bytes, {'new' if created else 'existing'} content {content_hash[:12]}).")
+    return version, created
+
+
+def prune_topology_versions(layer, keep=None):
+    """
+    Deletes all but the newest `keep` versions of a layer (TOPOJSON_KEEP_VERSIONS,
+    default 3), never the current one.
+
+    Returns:
+        int: Number of versions deleted.
+    """
+    keep = keep or getattr(settings, "TOPOJSON_KEEP_VERSIONS", 3)
+    model = TOPOLOGY_LAYERS[layer]["model"]
+    current = CurrentTopojson.objects.filter(layer=layer).values_list("version_id", flat=True).first()
+    kept = list(model.objects.order_by("-id").values_list("id", flat=True)[:keep])
+    if current is not None:
+        kept.append(current)
+    deleted, _ = model.objects.exclude(id__in=kept).delete()
+    if deleted:
+        print(f"Pruned {deleted} old {layer} TopoJSON versions.")
+    return deleted
+
+
+def get_current_topology_bytes(layer):
+    """
+    Returns (content_hash, canonical JSON bytes) of the layer's current
+    version, or None if none is stored. Served from cache; on a miss the
+    pointer and version are read by primary key and decompressed.
+    """
+    cache_key = topology_cache_key(layer)
+    current = get_value(cache_key)
+    if current is not None:
+        return current
+
+    pointer = CurrentTopojson.objects.filter(layer=layer).first()
+    if pointer is None:
+        return None
+    compressed = (
+        TOPOLOGY_LAYERS[layer]["model"].objects.filter(id=pointer.version_id).values_list("compressed", flat=True).first()
+    )
+    if compressed is None:
+        return None
+
+    current = (pointer.content_hash, zlib.decompress(compressed))
+    set_value(cache_key, current)
+    return current
+
+
+def get_current_topology(layer):
+    """
+    Returns the layer's current topology decoded, or None. Only for rebuilding
+    derived data; responses serve the bytes from get_current_topology_bytes.
+    """
+    current = get_current_topology_bytes(layer)
+    return json.loads(current[1]) if current else None
+
+
+def get_current_hashes():
+    """
+    Returns layer -> content hash of the current versions in one query.
+    """
+    return dict(CurrentTopojson.objects.values_list("layer", "content_hash"))
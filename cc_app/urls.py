@@ -11,9 +11,21 @@ router.register(r'combined_data', CombinedDataViewSet)
 
 urlpatterns = [
     path('', dashboard_view, name='cc_app'),
+    path('snapshots/<str:filename>', views.snapshot_file, name='snapshot_file'),
     path('api/us_states_topojson/', USStateTopoViewSet.as_view(), name='usstatetopojson-list'),
     path('api/us_districts_topojson/', USDistrictTopoViewSet.as_view(), name='usdistricttopojson-list'),
     path('api/ideology_data_by_topic/<str:topic>/', views.ideology_by_topic, name='ideology_by_topic'),
     path('api/ideology_topics/', views.ideology_topics, name='ideology_topics'),
+    path('api/ideology_trends/', views.ideology_trends, name='ideology_trends'),
+    path('api/posts/', views.top_posts, name='top_posts'),
+    path('api/topic_cooccurrence/', views.topic_cooccurrence, name='topic_cooccurrence'),
+    path('api/committees/', views.committees, name='committees'),
+    path('api/member_stats/', views.member_stats, name='member_stats'),
+    path('api/engagement_histogram/', views.engagement_histogram, name='engagement_histogram'),
+    path('api/search/', views.search, name='search'),
+    path('api/locate/', views.locate, name='locate'),
+    path('api/dashboard_bootstrap/', views.dashboard_bootstrap, name='dashboard_bootstrap'),
+    path('api/profiles/', views.profiles, name='profiles'),
+    path('api/profiles/<str:profile_id>/', views.profile_download, name='profile_download'),
     path('api/', include(router.urls)),
 ]
\ No newline at end of file
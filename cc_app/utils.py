@@ -1,14 +1,24 @@
 from django.core.cache import cache
 from django.http import JsonResponse
 import json
-from .models import CombinedData
-from collections import defaultdict
+from .cache_codec import get_value, get_many_values, set_value, set_many_values
+from .geo import get_geojson_payload
+from .models import CombinedData, CongressMembers, CongressMembersWithProportions, TopicTrendRollup, parse_created_timestamp
+from collections import defaultdict, Counter
+from datetime import timedelta
+from django.db import transaction, models
+from django.db.models import Sum, Avg, Count
+from bisect import bisect_left
 import ast
+import hashlib
+import numpy as np
+from django.core.serializers.json import DjangoJSONEncoder
 
 def get_cached_data(cache_key, fetch_function, timeout=14400):
     """
     Retrieves cached data if available, otherwise fetches data (from DB or API),
-    stores it in Redis cache, and returns it.
+    stores it in Redis cache, and returns it. Values go through cache_codec, so
+    large ones are compressed and split across several keys.
 
     Args:
         cache_key (str): Unique identifier for the cache.
@@ -19,7 +29,7 @@ def get_cached_data(cache_key, fetch_function, timeout=14400):
         JsonResponse: JSON response with the cached or fetched data.
     """
     # Check if data is cached in Redis
-    cached_data = cache.get(cache_key)
+    cached_data = get_value(cache_key)
     if cached_data is not None:
         print(f"Cache hit for key: {cache_key}")
         return cached_data
@@ -27,7 +37,7 @@ def get_cached_data(cache_key, fetch_function, timeout=14400):
     # If not cached, fetch from the API
     data = fetch_function()
     if data:
-        cache.set(cache_key, data, timeout=timeout)  # Cache for 4 hours
+        set_value(cache_key, data, timeout=timeout)  # Cache for 4 hours
         print(f"Cache miss for key: {cache_key} - data fetched and cached ({len(data) if isinstance(data, list) else 'unknown'} items)")
         return data
     else:
@@ -36,7 +46,10 @@ def get_cached_data(cache_key, fetch_function, timeout=14400):
         return None
 
 
-def get_ideology_data_for_topic(topic):
+def get_ideology_data_for_topic(topic, min_confidence=None, label_source=None):
+    if min_confidence is not None or label_source is not None:
+        return get_filtered_ideology_data_for_topic(topic, min_confidence, label_source)
+
     cache_key = f"ideology_topic:{topic}"
     cached = cache.get(cache_key)
     if cached is not None:
@@ -68,7 +81,10 @@ def get_ideology_data_for_topic(topic):
     return result
 
 TOPIC_LIST_CACHE_KEY = "ideology_topics"
-def get_ideology_topics():
+def get_ideology_topics(min_confidence=None, label_source=None):
+    if min_confidence is not None or label_source is not None:
+        return get_filtered_ideology_topics(min_confidence, label_source)
+
     cached = cache.get(TOPIC_LIST_CACHE_KEY)
     if cached is not None:
         print("Returning cached topics.")
@@ -101,4 +117,657 @@ def get_ideology_topics():
 
     if result:
         cache.set(TOPIC_LIST_CACHE_KEY, result, timeout=14400)  # Cache for 4 hours
-    return result
\ No newline at end of file
+    return result
+
+
+CONFIDENCE_INDEX_CACHE_KEY = "ideology_confidence_index"
+CONFIDENCE_INDEX_QUEUED_KEY = "ideology_confidence_index:queued"
+
+def parse_assigned_labels(labels):
+    """
+    Returns the list of labels stored in an assigned_label value, which may
+    be either a decoded JSON list or a raw JSON string. Returns an empty list
+    for empty or malformed values.
+    """
+    if not labels or labels == "[]":
+        return []
+    if isinstance(labels, str):
+        try:
+            labels = json.loads(labels)
+        except json.JSONDecodeError:
+            return []
+    return [label for label in labels if isinstance(label, str)]
+
+
+def build_confidence_index(timeout=None):
+    """
+    Scans combined_data once and caches, for every topic, the confidence scores
+    of its labeled rows grouped by state and label source and sorted ascending.
+    A per-topic summary holding the display label and the highest confidence for
+    each source is cached alongside so the topic list can be filtered without
+    loading every topic. Kept until the next build or invalidate_confidence_index.
+
+    Returns:
+        dict: topic -> {state: {label_source: sorted confidence list}}
+    """
+    index = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+    display_names = {}
+    queryset = CombinedData.objects.only("state", "assigned_label", "label_source", "confidence_score")
+
+    for row in queryset.iterator():
+        # A row counts once per topic even if the label is repeated
+        topics = set()
+        for label in parse_assigned_labels(row.assigned_label):
+            topic = label.strip().lower()
+            display_names.setdefault(topic, label.strip())
+            topics.add(topic)
+        for topic in topics:
+            index[topic][row.state][row.label_source.strip()].append(row.confidence_score)
+
+    result = {}
+    summary = {}
+    for topic, states in index.items():
+        result[topic] = {}
+        max_scores = {}
+        for state, sources in states.items():
+            result[topic][state] = {}
+            for source, scores in sources.items():
+                scores.sort()
+                result[topic][state][source] = scores
+                max_scores[source] = max(max_scores.get(source, scores[-1]), scores[-1])
+        summary[topic] = {"label": display_names[topic], "max_scores": max_scores}
+
+    for topic, states in result.items():
+        set_value(f"{CONFIDENCE_INDEX_CACHE_KEY}:{topic}", states, timeout=timeout)
+    # Topics that no longer have rows would otherwise keep their keys forever
+    previous_topics = cache.get(f"{CONFIDENCE_INDEX_CACHE_KEY}:topics") or []
+    cache.delete_many([f"{CONFIDENCE_INDEX_CACHE_KEY}:{topic}" for topic in previous_topics if topic not in result])
+    cache.set(f"{CONFIDENCE_INDEX_CACHE_KEY}:topics", sorted(result), timeout=timeout)
+    cache.set(f"{CONFIDENCE_INDEX_CACHE_KEY}:summary", summary, timeout=timeout)
+    cache.delete(CONFIDENCE_INDEX_QUEUED_KEY)
+    print(f"Built confidence index for {len(result)} topics.")
+    return result
+
+
+def invalidate_confidence_index():
+    """
+    Marks the confidence index as not built, so filtered ideology requests
+    queue a rebuild instead of counting from stale scores.
+    """
+    cache.delete(f"{CONFIDENCE_INDEX_CACHE_KEY}:summary")
+
+
+def count_at_or_above(scores, min_confidence):
+    """
+    Counts the entries of an ascending list that are >= min_confidence.
+    """
+    if min_confidence is None:
+        return len(scores)
+    return len(scores) - bisect_left(scores, min_confidence)
+
+
+def get_filtered_ideology_data_for_topic(topic, min_confidence=None, label_source=None):
+    """
+    Returns per-state counts for a topic restricted to rows whose confidence is
+    at least min_confidence and, if given, whose label source matches. Counts are
+    answered by binary search over the cached confidence index, so any threshold
+    costs one cache read instead of a table scan. Returns None if the index
+    isn't built (or lost the topic's entry); an unknown topic returns [].
+    """
+    topic_key = topic.strip().lower()
+    summary = cache.get(f"{CONFIDENCE_INDEX_CACHE_KEY}:summary")
+    if summary is None:
+        return None
+    if topic_key not in summary:
+        return []
+    states = get_value(f"{CONFIDENCE_INDEX_CACHE_KEY}:{topic_key}")
+    if states is None:
+        # Evicted since the summary was written
+        return None
+
+    result = []
+    for state, sources in states.items():
+        count = sum(
+            count_at_or_above(scores, min_confidence)
+            for source, scores in sources.items()
+            if label_source is None or source == label_source
+        )
+        if count:
+            result.append({"state": state, "count": count})
+    return result
+
+
+def get_filtered_ideology_topics(min_confidence=None, label_source=None):
+    """
+    Returns the sorted topics that have at least one row passing the confidence
+    and label source filters. Returns None if the confidence index isn't built.
+    """
+    summary = cache.get(f"{CONFIDENCE_INDEX_CACHE_KEY}:summary")
+    if summary is None:
+        return None
+
+    return sorted(
+        entry["label"] for entry in summary.values()
+        if any(
+            (label_source is None or source == label_source)
+            and (min_confidence is None or max_score >= min_confidence)
+            for source, max_score in entry["max_scores"].items()
+        )
+    )
+
+
+
+TREND_PERIODS = ("day", "week", "month")
+
+def period_start(day, period):
+    """
+    Returns the first date of the day, ISO week (Monday) or month containing day.
+    """
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def backfill_created_time():
+    """
+    Parses created_utc / created_at into created_time for rows that were bulk
+    loaded without going through CombinedData.save().
+    """
+    batch = []
+    updated = 0
+    queryset = CombinedData.objects.filter(created_time__isnull=True).only("created_utc", "created_at", "created_time")
+    for row in queryset.iterator():
+        row.created_time = parse_created_timestamp(row.created_utc, row.created_at)
+        if row.created_time is not None:
+            batch.append(row)
+        if len(batch) >= 1000:
+            CombinedData.objects.bulk_update(batch, ["created_time"])
+            updated += len(batch)
+            batch = []
+    if batch:
+        CombinedData.objects.bulk_update(batch, ["created_time"])
+        updated += len(batch)
+    return updated
+
+
+TOPIC_TRENDS_QUEUED_KEY = "topic_trend_rollups:queued"
+
+def rebuild_topic_trend_rollups():
+    """
+    Recomputes the day / week / month per-topic, per-state post counts in one
+    pass over combined_data and replaces the contents of topic_trend_rollups.
+
+    Returns:
+        int: Number of rollup rows written.
+    """
+    backfill_created_time()
+
+    counts = Counter()
+    queryset = CombinedData.objects.filter(created_time__isnull=False).only("state", "assigned_label", "created_time")
+    for row in queryset.iterator():
+        topics = {label.strip().lower() for label in parse_assigned_labels(row.assigned_label)}
+        if not topics:
+            continue
+        created_day = row.created_time.date()
+        starts = [(period, period_start(created_day, period)) for period in TREND_PERIODS]
+        for topic in topics:
+            for period, start in starts:
+                counts[(period, start, topic, row.state)] += 1
+
+    rollups = [
+        TopicTrendRollup(period=period, period_start=start, topic=topic, state=state, count=count)
+        for (period, start, topic, state), count in counts.items()
+    ]
+    with transaction.atomic():
+        TopicTrendRollup.objects.all().delete()
+        TopicTrendRollup.objects.bulk_create(rollups, batch_size=1000)
+
+    cache.delete(TOPIC_TRENDS_QUEUED_KEY)
+    print(f"Rebuilt {len(rollups)} topic trend rollup rows.")
+    return len(rollups)
+
+
+def get_topic_trends(topic, period="week", state=None, start=None, end=None):
+    """
+    Returns post counts for a topic per period, read only from the rollup rows
+    inside the requested window. Counts are summed across states unless a state
+    is given. Returns None if the rollups haven't been built yet; they are
+    rebuilt by the refresh_topic_trend_rollups task, never on a request.
+    """
+    if not TopicTrendRollup.objects.exists():
+        return None
+
+    queryset = TopicTrendRollup.objects.filter(period=period, topic=topic.strip().lower())
+    if state:
+        queryset = queryset.filter(state=state)
+    if start:
+        queryset = queryset.filter(period_start__gte=period_start(start, period))
+    if end:
+        queryset = queryset.filter(period_start__lte=end)
+
+    rows = queryset.values("period_start").annotate(count=Sum("count")).order_by("period_start")
+    return [{"period_start": row["period_start"].isoformat(), "count": row["count"]} for row in rows]
+
+
+
+TOP_POSTS_CACHE_SIZE = 50
+TOP_POSTS_METRICS = ("score", "num_comments")
+TOP_POSTS_FIELDS = ("row_id", "post_id", "title", "url", "author", "state", "primary_label", "score", "num_comments", "created_time")
+
+def top_posts_cache_key(state, topic, metric):
+    # Topics match case-insensitively, as on the other topic endpoints
+    return f"top_posts:{state}:{topic.strip().lower()}:{metric}"
+
+
+def post_summary(row):
+    """
+    Returns the fields of a combined_data row shown in post drill-downs.
+    """
+    return {field: getattr(row, field) for field in TOP_POSTS_FIELDS}
+
+
+def get_top_posts(state, topic, metric="score", limit=10):
+    """
+    Returns the highest ranked posts for a state and primary label, ordered by
+    metric. The top TOP_POSTS_CACHE_SIZE posts of each (state, topic, metric)
+    are cached and kept current on ingest by update_top_posts_cache.
+    """
+    def fetch_top_posts():
+        queryset = (
+            CombinedData.objects.filter(state=state, primary_label__iexact=topic.strip())
+            .only(*TOP_POSTS_FIELDS)
+            .order_by(f"-{metric}", "row_id")[:TOP_POSTS_CACHE_SIZE]
+        )
+        return [post_summary(row) for row in queryset]
+
+    posts = get_cached_data(top_posts_cache_key(state, topic, metric), fetch_top_posts)
+    return (posts or [])[:limit]
+
+
+def update_top_posts_cache(row):
+    """
+    Folds a newly saved combined_data row into the cached top posts lists for
+    its state and primary label. A list that is not cached is left for the next
+    read to fill; a list where a cached post lost rank is dropped, since the post
+    that should replace it is not known without querying. For the same reason
+    the lists of the row's previous state and label are dropped when it moved.
+    """
+    previous_group = getattr(row, "_loaded_top_posts_group", None)
+    if previous_group and None not in previous_group:
+        previous_state, previous_label = previous_group
+        if (previous_state, previous_label.strip().lower()) != (row.state, row.primary_label.strip().lower()):
+            cache.delete_many([top_posts_cache_key(previous_state, previous_label, metric) for metric in TOP_POSTS_METRICS])
+    row._loaded_top_posts_group = (row.state, row.primary_label)
+
+    for metric in TOP_POSTS_METRICS:
+        cache_key = top_posts_cache_key(row.state, row.primary_label, metric)
+        posts = get_value(cache_key)
+        if posts is None:
+            continue
+
+        summary = post_summary(row)
+        previous = next((post for post in posts if post["row_id"] == row.row_id), None)
+        if previous is not None and summary[metric] < previous[metric]:
+            cache.delete(cache_key)
+            continue
+
+        posts = [post for post in posts if post["row_id"] != row.row_id]
+        if len(posts) >= TOP_POSTS_CACHE_SIZE and summary[metric] <= posts[-1][metric]:
+            continue
+
+        posts.append(summary)
+        posts.sort(key=lambda post: (-post[metric], post["row_id"]))
+        set_value(cache_key, posts[:TOP_POSTS_CACHE_SIZE], timeout=14400)
+
+
+def invalidate_top_posts_cache(row):
+    cache.delete_many([top_posts_cache_key(row.state, row.primary_label, metric) for metric in TOP_POSTS_METRICS])
+
+
+
+TOPIC_INDICATOR_COLUMNS = [
+    "agriculture_and_food",
+    "crime_and_law_enforcement",
+    "culture_and_recreation",
+    "economy_and_finance",
+    "education_and_social_services",
+    "environment_and_natural_resources",
+    "government_operations_and_politics",
+    "health_and_healthcare",
+    "immigration_and_civil_rights",
+    "national_security_and_international_affairs",
+    "science_technology_and_communications",
+    "transportation_and_infrastructure",
+    "other_uncategorized",
+]
+
+
+
+DASHBOARD_BOOTSTRAP_BODY_KEY = "dashboard_bootstrap:body"
+DASHBOARD_BOOTSTRAP_VERSION_KEY = "dashboard_bootstrap:version"
+
+def get_dashboard_bootstrap(timeout=14400):
+    """
+    Returns (version, body) for the dashboard's initial payload: the states and
+    districts GeoJSON, congress members, member proportions and ideology topics
+    in one JSON document. The member and topic parts are read with a single
+    get_many_values, the GeoJSON through get_geojson_payload, and the assembled
+    body is cached as bytes; version is a hash of the body so the
+    browser can cache it under a versioned URL. Returns None while the GeoJSON
+    isn't built.
+    """
+    cached = get_many_values([DASHBOARD_BOOTSTRAP_VERSION_KEY, DASHBOARD_BOOTSTRAP_BODY_KEY])
+    if len(cached) == 2:
+        return cached[DASHBOARD_BOOTSTRAP_VERSION_KEY], cached[DASHBOARD_BOOTSTRAP_BODY_KEY]
+
+    geojson = {layer: get_geojson_payload(layer) for layer in ("states", "districts")}
+    if None in geojson.values():
+        return None
+
+    fetchers = {
+        "congress_members": lambda: get_cached_data("congress_members", lambda: list(CongressMembers.objects.values())),
+        "congress_members_with_proportions": lambda: get_cached_data(
+            "congress_members_with_proportions", lambda: list(CongressMembersWithProportions.objects.values())
+        ),
+        TOPIC_LIST_CACHE_KEY: get_ideology_topics,
+    }
+    parts = get_many_values(list(fetchers))
+    for key, fetch in fetchers.items():
+        if parts.get(key) is None:
+            parts[key] = fetch()
+
+    def encode(value):
+        # GeoJSON parts are already encoded; embed them without re-parsing
+        if isinstance(value, bytes):
+            return value
+        return json.dumps(value, cls=DjangoJSONEncoder, separators=(",", ":")).encode("utf-8")
+
+    sections = {
+        "states": geojson["states"] or b"null",
+        "districts": geojson["districts"] or b"null",
+        "congress_members": parts["congress_members"] or [],
+        "member_proportions": parts["congress_members_with_proportions"] or [],
+        "ideology_topics": parts[TOPIC_LIST_CACHE_KEY] or [],
+    }
+    body = b"{" + b",".join(json.dumps(name).encode("utf-8") + b":" + encode(value) for name, value in sections.items()) + b"}"
+    version = hashlib.sha256(body).hexdigest()[:16]
+
+    # Body first, so a reader that sees the new version also finds its body
+    set_value(DASHBOARD_BOOTSTRAP_BODY_KEY, body, timeout=timeout)
+    cache.set(DASHBOARD_BOOTSTRAP_VERSION_KEY, version, timeout=timeout)
+    return version, body
+
+
+def get_dashboard_bootstrap_version():
+    """
+    Returns only the bootstrap version, for embedding the versioned URL in the
+    page, or None while the bootstrap can't be built.
+    """
+    version = cache.get(DASHBOARD_BOOTSTRAP_VERSION_KEY)
+    if version is None:
+        bootstrap = get_dashboard_bootstrap()
+        version = bootstrap[0] if bootstrap else None
+    return version
+
+
+def invalidate_dashboard_bootstrap(*part_keys):
+    """
+    Drops the bootstrap bundle, along with the cached parts it embeds that
+    changed, so the next request reassembles it from current data.
+    """
+    cache.delete_many([DASHBOARD_BOOTSTRAP_VERSION_KEY, DASHBOARD_BOOTSTRAP_BODY_KEY, *part_keys])
+
+
+def invalidate_topic_list_for(row):
+    """
+    Drops the cached topic list and the bootstrap embedding it when a saved
+    row carries a label the list doesn't have yet. Rows with known labels
+    leave both alone, so ingest doesn't force a topic rescan per row.
+    """
+    topics = cache.get(TOPIC_LIST_CACHE_KEY)
+    if topics is not None and {label.strip() for label in parse_assigned_labels(row.assigned_label)} - set(topics):
+        invalidate_dashboard_bootstrap(TOPIC_LIST_CACHE_KEY)
+
+
+
+MEMBER_CACHE_PREFIX = "congress_member"
+MEMBER_PROPORTIONS_CACHE_PREFIX = "member_proportions"
+
+def object_cache_key(prefix, pk):
+    return f"{prefix}:{pk}"
+
+
+def get_cached_objects(queryset, prefix, pks, timeout=14400):
+    """
+    Returns the rows of queryset with the given primary keys as value dicts,
+    in the order requested; unknown keys are skipped. Rows are cached per
+    object, so a batch costs one get_many plus one IN query for the misses.
+    """
+    keys = {object_cache_key(prefix, pk): pk for pk in pks}
+    cached = get_many_values(keys)
+    found = {keys[key]: value for key, value in cached.items()}
+
+    missing = [pk for pk in keys.values() if pk not in found]
+    if missing:
+        pk_name = queryset.model._meta.pk.name
+        fetched = {row[pk_name]: row for row in queryset.filter(pk__in=missing).values()}
+        if fetched:
+            set_many_values({object_cache_key(prefix, pk): row for pk, row in fetched.items()}, timeout=timeout)
+        found.update(fetched)
+
+    return [found[pk] for pk in keys.values() if pk in found]
+
+
+def invalidate_cached_object(prefix, pk, list_cache_key=None):
+    cache.delete_many([key for key in (object_cache_key(prefix, pk), list_cache_key) if key])
+
+
+
+MEMBER_STATS_GROUPS = ("state", "party", "chamber")
+MEMBER_STATS_CACHE_KEYS = [f"member_stats:{group_by}" for group_by in MEMBER_STATS_GROUPS] + ["member_stats:state_topic_means"]
+
+def get_state_topic_means():
+    """
+    Returns the mean of every member_proportions topic column per state as
+    {"columns", "states", "means"}, where means[i][j] is states[i]'s mean of
+    columns[j]. The columns are loaded as one matrix and summed per state in a
+    single vectorized pass.
+    """
+    def fetch_state_topic_means():
+        columns = [
+            field.name for field in CongressMembersWithProportions._meta.fields
+            if isinstance(field, models.FloatField)
+        ]
+        rows = list(CongressMembersWithProportions.objects.values_list("state", *columns))
+        if not rows:
+            return None
+
+        states, codes = np.unique([row[0] for row in rows], return_inverse=True)
+        values = np.asarray([row[1:] for row in rows], dtype=np.float64)
+        counts = np.bincount(codes, minlength=len(states))
+        sums = np.zeros((len(states), len(columns)))
+        np.add.at(sums, codes, values)
+        means = np.round(sums / counts[:, None], 4)
+        return {"columns": columns, "states": states.tolist(), "means": means.tolist()}
+
+    return get_cached_data("member_stats:state_topic_means", fetch_state_topic_means)
+
+
+def get_member_stats(group_by):
+    """
+    Returns member counts and sponsored / cosponsored bill totals and averages
+    per state, party or chamber from a single GROUP BY, plus the per-state
+    topic proportion means.
+    """
+    def fetch_member_stats():
+        groups = list(
+            CongressMembers.objects.values(group_by)
+            .annotate(
+                members=Count("bioguide_id"),
+                total_sponsored_bills=Sum("sponsored_bills"),
+                total_cosponsored_bills=Sum("cosponsored_bills"),
+                avg_sponsored_bills=Avg("sponsored_bills"),
+                avg_cosponsored_bills=Avg("cosponsored_bills"),
+            )
+            .order_by(group_by)
+        )
+        if not groups:
+            return None
+        for group in groups:
+            group["avg_sponsored_bills"] = round(group["avg_sponsored_bills"], 2)
+            group["avg_cosponsored_bills"] = round(group["avg_cosponsored_bills"], 2)
+        return groups
+
+    groups = get_cached_data(f"member_stats:{group_by}", fetch_member_stats)
+    if not groups:
+        return None
+    return {"group_by": group_by, "groups": groups, "state_topic_means": get_state_topic_means() or {}}
+
+
+def invalidate_member_stats():
+    cache.delete_many(MEMBER_STATS_CACHE_KEYS)
+
+
+
+ENGAGEMENT_METRICS = ("score", "num_comments", "lead_time")
+# Histograms are stored at this resolution; requested bin counts must divide it
+ENGAGEMENT_BASE_BINS = 60
+ENGAGEMENT_BIN_CHOICES = [bins for bins in range(1, ENGAGEMENT_BASE_BINS + 1) if ENGAGEMENT_BASE_BINS % bins == 0]
+ENGAGEMENT_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+ENGAGEMENT_BUILT_KEY = "engagement_histogram:built"
+ENGAGEMENT_KEYS_KEY = "engagement_histogram:keys"
+ENGAGEMENT_QUEUED_KEY = "engagement_histogram:queued"
+
+def engagement_histogram_key(metric, topic=None, state=None):
+    return f"engagement_histogram:{metric}:{topic or 'all'}:{state or 'all'}"
+
+
+def build_engagement_histograms(timeout=None):
+    """
+    Computes, for each engagement metric, a ENGAGEMENT_BASE_BINS histogram and
+    summary quantiles for every (primary label, state) pair as well as the
+    all-state, all-topic and overall totals, and caches each under its own
+    key. All posts are read in one query and binned with one bincount per
+    metric. Bin edges are shared by every group of a metric so charts compare
+    directly: linear up to the 99th percentile, with the last bin holding the
+    long tail. Kept until the next build or invalidate_engagement_histograms.
+
+    Returns:
+        dict: cache key -> histogram entry.
+    """
+    rows = list(CombinedData.objects.values_list("primary_label", "state", *ENGAGEMENT_METRICS))
+    if not rows:
+        store_engagement_histograms({}, timeout)
+        return {}
+
+    topics, topic_codes = np.unique([row[0] for row in rows], return_inverse=True)
+    states, state_codes = np.unique([row[1] for row in rows], return_inverse=True)
+    topic_names = [*topics.tolist(), None]
+    state_names = [*states.tolist(), None]
+
+    # Each post is counted in its (topic, state) group and in the groups
+    # where the topic, the state or both are "all" (the last code)
+    rows_count = len(rows)
+    all_topics = np.full(rows_count, len(topics))
+    all_states = np.full(rows_count, len(states))
+    groups = (
+        np.concatenate([topic_codes, topic_codes, all_topics, all_topics]) * len(state_names)
+        + np.concatenate([state_codes, all_states, state_codes, all_states])
+    )
+    group_count = len(topic_names) * len(state_names)
+
+    entries = {}
+    for i, metric in enumerate(ENGAGEMENT_METRICS):
+        values = np.asarray([row[2 + i] for row in rows], dtype=np.float64)
+        low, high, top = values.min(), np.quantile(values, 0.99), values.max()
+        if top > high:
+            edges = np.append(np.linspace(low, high, ENGAGEMENT_BASE_BINS), top)
+        else:
+            edges = np.linspace(low, top, ENGAGEMENT_BASE_BINS + 1)
+
+        bins = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, ENGAGEMENT_BASE_BINS - 1)
+        counts = np.bincount(
+            groups * ENGAGEMENT_BASE_BINS + np.tile(bins, 4), minlength=group_count * ENGAGEMENT_BASE_BINS
+        ).reshape(group_count, ENGAGEMENT_BASE_BINS)
+
+        # Sort by (group, value) once so each group's values are a contiguous sorted slice
+        all_values = np.tile(values, 4)
+        order = np.lexsort((all_values, groups))
+        sorted_values = all_values[order]
+        bounds = np.searchsorted(groups[order], np.arange(group_count + 1))
+        rounded_edges = np.round(edges, 4).tolist()
+
+        for group in range(group_count):
+            start, end = bounds[group], bounds[group + 1]
+            if start == end:
+                continue
+            group_values = sorted_values[start:end]
+            topic = topic_names[group // len(state_names)]
+            state = state_names[group % len(state_names)]
+            entries[engagement_histogram_key(metric, topic, state)] = {
+                "edges": rounded_edges,
+                "counts": counts[group].tolist(),
+                "count": int(end - start),
+                "mean": round(float(group_values.mean()), 4),
+                "min": float(group_values[0]),
+                "max": float(group_values[-1]),
+                "quantiles": {
+                    f"p{round(q * 100)}": round(float(value), 4)
+                    for q, value in zip(ENGAGEMENT_QUANTILES, np.quantile(group_values, ENGAGEMENT_QUANTILES))
+                },
+            }
+
+    store_engagement_histograms(entries, timeout)
+    print(f"Cached {len(entries)} engagement histograms from {rows_count} posts.")
+    return entries
+
+
+def store_engagement_histograms(entries, timeout=None):
+    set_many_values(entries, timeout=timeout)
+    # Groups that no longer have posts would otherwise keep their keys forever
+    previous_keys = cache.get(ENGAGEMENT_KEYS_KEY) or set()
+    cache.delete_many(list(previous_keys - set(entries)))
+    cache.set(ENGAGEMENT_KEYS_KEY, set(entries), timeout=timeout)
+    # The set of built keys tells an evicted histogram apart from a group with no posts
+    cache.set(ENGAGEMENT_BUILT_KEY, set(entries), timeout=timeout)
+    cache.delete(ENGAGEMENT_QUEUED_KEY)
+
+
+def invalidate_engagement_histograms():
+    """
+    Marks the engagement histograms as not built, so requests queue a rebuild
+    instead of serving counts that miss the changed post.
+    """
+    cache.delete(ENGAGEMENT_BUILT_KEY)
+
+
+def get_engagement_histogram(metric, topic=None, state=None, bins=20):
+    """
+    Returns the histogram and quantiles of a metric for a primary label and
+    state (either may be None for all), with the stored bins merged down to
+    bins. Returns {} if no posts match, or None if the histograms aren't built
+    (or lost this entry).
+    """
+    cache_key = engagement_histogram_key(metric, topic, state)
+    built = cache.get(ENGAGEMENT_BUILT_KEY)
+    if built is None:
+        return None
+    if cache_key not in built:
+        return {}
+    entry = get_value(cache_key)
+    if entry is None:
+        # Evicted since the histograms were built
+        return None
+
+    merge = ENGAGEMENT_BASE_BINS // bins
+    return {
+        "metric": metric,
+        "topic": topic,
+        "state": state,
+        "bins": bins,
+        **entry,
+        "edges": entry["edges"][::merge],
+        "counts": np.asarray(entry["counts"]).reshape(bins, merge).sum(axis=1).tolist(),
+    }
@@ -1,93 +1,209 @@
+import json
+import math
+import os
+from datetime import date
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, JsonResponse
 from django.shortcuts import render
+from django.urls import reverse
+from django.views.decorators.http import require_GET
 from rest_framework import viewsets
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.settings import api_settings
 from rest_framework import status
-from .utils import get_cached_data, get_ideology_data_for_topic, get_ideology_topics
-from .models import CongressMembers, CongressMembersWithProportions, CombinedData, USStateTopojson, USDistrictTopojson
-from .serializers import CongressMembersSerializer, CongressMembersWithProportionsSerializer, CombinedDataSerializer, USStateTopojsonSerializer, USDistrictTopojsonSerializer
+from .utils import get_cached_data, get_ideology_data_for_topic, get_ideology_topics, get_topic_trends, TREND_PERIODS
+from .utils import TOPIC_TRENDS_QUEUED_KEY, CONFIDENCE_INDEX_QUEUED_KEY
+from .utils import get_top_posts, TOP_POSTS_METRICS, TOP_POSTS_CACHE_SIZE
+from .utils import get_dashboard_bootstrap, get_dashboard_bootstrap_version, invalidate_dashboard_bootstrap
+from .utils import get_cached_objects, get_member_stats, MEMBER_STATS_GROUPS
+from .utils import MEMBER_CACHE_PREFIX, MEMBER_PROPORTIONS_CACHE_PREFIX
+from .utils import get_engagement_histogram, ENGAGEMENT_METRICS, ENGAGEMENT_BIN_CHOICES, ENGAGEMENT_QUEUED_KEY
+from .search import search_posts, SEARCH_INDEX_QUEUED_KEY
+from .committees import get_committees, get_committee_index, COMMITTEE_MEMBER_FIELDS
+from .geo import get_district_index, invalidate_district_index, get_geojson_payload, build_geojson_payloads, GEOJSON_QUEUED_KEY
+from .topology_store import get_current_topology_bytes, read_topology_upload, read_topology_form, store_topology
+from .renderers import GeoJSONRenderer
+from .snapshots import get_snapshot_manifest, snapshot_path, invalidate_snapshots
+from .analytics import get_analytics_snapshot, ANALYTICS_SNAPSHOT_QUEUED_KEY
+from .profiling import list_profiles, get_profile, arm_task_profile
+from . import tasks
+from .models import CongressMembers, CongressMembersWithProportions, CombinedData
+from .serializers import CongressMembersSerializer, CongressMembersWithProportionsSerializer, CombinedDataSerializer
 
 # Create your views here.
 def dashboard_view(request):
-    return render(request, 'dashboard.html')
+    snapshots = get_snapshot_manifest()
+    if "dashboard_bootstrap" in snapshots:
+        bootstrap_url = snapshots["dashboard_bootstrap"]
+    else:
+        version = get_dashboard_bootstrap_version()
+        bootstrap_url = f"{reverse('dashboard_bootstrap')}?v={version}" if version else reverse("dashboard_bootstrap")
+    return render(request, 'dashboard.html', {"bootstrap_url": bootstrap_url, "snapshots": snapshots})
+
+@require_GET
+def snapshot_file(request, filename):
+    """
+    Serves a published snapshot (gzipped when the client accepts it) with
+    far-future cache headers; the filename carries the content hash.
+    """
+    path = snapshot_path(filename)
+    if path is None:
+        raise Http404("Snapshot not found")
+    gzipped = "gzip" in request.headers.get("Accept-Encoding", "") and os.path.exists(f"{path}.gz")
+    response = FileResponse(open(f"{path}.gz" if gzipped else path, "rb"), content_type="application/json")
+    if gzipped:
+        response["Content-Encoding"] = "gzip"
+    response["Vary"] = "Accept-Encoding"
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+@require_GET
+def dashboard_bootstrap(request):
+    """
+    Return the dashboard's initial data in one response. The body is served
+    from cache as pre-encoded bytes; requests carrying the current ?v= version
+    may be cached by the browser indefinitely.
+    """
+    bootstrap = get_dashboard_bootstrap()
+    if bootstrap is None:
+        queue_geojson_build()
+        return JsonResponse({"message": GEOJSON_BUILDING_MESSAGE}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    version, body = bootstrap
+    etag = f'"{version}"'
+    if request.headers.get("If-None-Match") == etag:
+        return HttpResponseNotModified()
+
+    response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    if request.GET.get("v") == version:
+        response["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        response["Cache-Control"] = "no-cache"
+    return response
     
-class USStateTopoViewSet(APIView):
+FORM_CONTENT_TYPES = ("application/x-www-form-urlencoded", "multipart/form-data")
+
+GEOJSON_BUILDING_MESSAGE = "GeoJSON data is being built. Please try again later."
+
+def queue_geojson_build():
+    # Queue one build rather than converting the TopoJSON on this request
+    if cache.add(GEOJSON_QUEUED_KEY, True, timeout=600):
+        tasks.refresh_geojson_payloads.delay()
+
+class TopojsonLayerMixin:
+    """
+    GET serves the layer's current TopoJSON version as stored bytes (or the
+    GeoJSON built from it with ?format=geojson); POST stores a new version.
+    """
+    layer = None
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, GeoJSONRenderer]
+
     def get(self, request, *args, **kwargs):
-        def fetch_states():
-            try:
-                # Get the latest TopoJSON entry from the database
-                topojson_data = USStateTopojson.objects.latest('id')
-                serializer = USStateTopojsonSerializer(topojson_data)
-
-                topojson = serializer.data.get("topojson", {})
-                if "type" not in topojson:
-                    topojson["type"] = "Topology"
-
-                return{
-                    "type": "Topology",
-                    **topojson  # Merge with the existing TopoJSON structure
-                }
-            except USStateTopojson.DoesNotExist:
-                return None
-            
-        formatted_topojson = get_cached_data("us_states_topojson", fetch_states)
-        if formatted_topojson:
-            return Response(formatted_topojson, status=status.HTTP_200_OK)
-        else:
+        if request.accepted_renderer.format == "geojson":
+            payload = get_geojson_payload(self.layer, request.query_params.get("state"))
+            if payload is None:
+                queue_geojson_build()
+                return Response({"message": GEOJSON_BUILDING_MESSAGE}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            if not payload:
+                return Response({"error": "No GeoJSON data found"}, status=status.HTTP_404_NOT_FOUND)
+            return Response(payload, status=status.HTTP_200_OK)
+
+        current = get_current_topology_bytes(self.layer)
+        if current is None:
             return Response({"error": "No TopoJSON data found"}, status=status.HTTP_404_NOT_FOUND)
-        
-    def post(self, request, *args, **kwargs):
-        """
-        Allows inserting a new TopoJSON entry via POST request.
-        """
-        serializer = USStateTopojsonSerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-    
-class USDistrictTopoViewSet(APIView):
-    def get(self, request, *args, **kwargs):
-        def fetch_districts():
-            try:
-                # Get the latest TopoJSON entry from the database
-                topojson_data = USDistrictTopojson.objects.latest('id')
-                serializer = USDistrictTopojsonSerializer(topojson_data)
-
-                topojson = serializer.data.get("topojson", {})
-                if "type" not in topojson:
-                    topojson["type"] = "Topology"
-
-                return {
-                    "type": "Topology",
-                    **topojson  # Merge with the existing TopoJSON structure
-                }
-            except USDistrictTopojson.DoesNotExist:
-                return None
-            
-        formatted_topojson = get_cached_data("us_districts_topojson", fetch_districts)
-        if formatted_topojson:
-            return Response(formatted_topojson, status=status.HTTP_200_OK)
+
+        content_hash, body = current
+        etag = f'"{content_hash}"'
+        if request.headers.get("If-None-Match") == etag:
+            return HttpResponseNotModified()
+        if request.accepted_renderer.format == "json":
+            # Already encoded; no need to decode and re-render it
+            response = HttpResponse(body, content_type="application/json")
         else:
-            return Response({"error": "No TopoJSON data found"}, status=status.HTTP_404_NOT_FOUND)
-        
+            response = Response(json.loads(body), status=status.HTTP_200_OK)
+        response["ETag"] = etag
+        return response
+
     def post(self, request, *args, **kwargs):
         """
-        Allows inserting a new TopoJSON entry via POST request.
+        Stores the uploaded TopoJSON (the topology, or {"topojson": topology})
+        as a new version, read from the request stream and validated once.
+        Form-encoded and multipart uploads send it in a topojson field, as a
+        JSON string or a file. The GeoJSON variants served by ?format=geojson
+        are rebuilt from it.
         """
-        serializer = USDistrictTopojsonSerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            if request.content_type.startswith(FORM_CONTENT_TYPES):
+                topology = read_topology_form(request.data.get("topojson"), self.layer)
+            else:
+                topology = read_topology_upload(request.stream, self.layer)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        version, created = store_topology(self.layer, topology)
+        invalidate_district_index()
+        # Convert to GeoJSON once here rather than in every browser
+        build_geojson_payloads(self.layer, topology, version.content_hash)
+        invalidate_dashboard_bootstrap()
+        invalidate_snapshots()
+        return Response(
+            {"id": version.id, "content_hash": version.content_hash, "size": version.size, "created": created},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+class USStateTopoViewSet(TopojsonLayerMixin, APIView):
+    layer = "states"
+
+class USDistrictTopoViewSet(TopojsonLayerMixin, APIView):
+    layer = "districts"
+
+
+class CachedMemberMixin:
+    """
+    Per-object caching for member viewsets keyed by bioguide_id, plus a batch
+    lookup through ?ids=A000001,B000002 and a ?committee= filter on the list
+    route.
+    """
+    object_cache_prefix = None
+    max_batch_size = 500
+
+    def retrieve(self, request, *args, **kwargs):
+        rows = get_cached_objects(self.queryset, self.object_cache_prefix, [kwargs[self.lookup_field]])
+        if not rows:
+            return Response({"error": "No data found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(rows[0], status=status.HTTP_200_OK)
+
+    def batch_retrieve(self, ids):
+        ids = list(dict.fromkeys(pk.strip() for pk in ids.split(",") if pk.strip()))
+        if len(ids) > self.max_batch_size:
+            return Response({"error": f"At most {self.max_batch_size} ids per request."}, status=status.HTTP_400_BAD_REQUEST)
 
+        rows = get_cached_objects(self.queryset, self.object_cache_prefix, ids)
+        if not rows:
+            return Response({"error": "No data found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(rows, status=status.HTTP_200_OK)
 
-class CongressMembersViewSet(viewsets.ModelViewSet):
+    def committee_retrieve(self, committee):
+        rows = get_cached_objects(self.queryset, self.object_cache_prefix, get_committee_index().member_ids(committee))
+        if not rows:
+            return Response({"error": "No members found for committee."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(rows, status=status.HTTP_200_OK)
+
+class CongressMembersViewSet(CachedMemberMixin, viewsets.ModelViewSet):
     queryset = CongressMembers.objects.all()
     serializer_class = CongressMembersSerializer
+    object_cache_prefix = MEMBER_CACHE_PREFIX
 
     def list(self, request, *args, **kwargs):
+        if request.query_params.get("ids"):
+            return self.batch_retrieve(request.query_params["ids"])
+        if request.query_params.get("committee"):
+            return self.committee_retrieve(request.query_params["committee"])
+
         def fetch_members():
             return list(self.queryset.values())
         
@@ -97,11 +213,17 @@ class CongressMembersViewSet(viewsets.ModelViewSet):
         else:
             return Response({"error": "No data found"}, status=status.HTTP_404_NOT_FOUND)
 
-class CongressMembersWithProportionsViewSet(viewsets.ModelViewSet):
+class CongressMembersWithProportionsViewSet(CachedMemberMixin, viewsets.ModelViewSet):
     queryset = CongressMembersWithProportions.objects.all()
     serializer_class = CongressMembersWithProportionsSerializer
+    object_cache_prefix = MEMBER_PROPORTIONS_CACHE_PREFIX
 
     def list(self, request, *args, **kwargs):
+        if request.query_params.get("ids"):
+            return self.batch_retrieve(request.query_params["ids"])
+        if request.query_params.get("committee"):
+            return self.committee_retrieve(request.query_params["committee"])
+
         def fetch_members_with_proportions():
             return list(self.queryset.values())
         
@@ -126,14 +248,57 @@ class CombinedDataViewSet(viewsets.ModelViewSet):
         else:
             return Response({"error": "No data found"}, status=status.HTTP_404_NOT_FOUND)
 
+
+def parse_ideology_filters(request):
+    """
+    Reads the optional min_confidence and label_source query parameters.
+    Raises ValueError if min_confidence is not a finite number.
+    """
+    min_confidence = request.query_params.get("min_confidence")
+    label_source = request.query_params.get("label_source")
+
+    if min_confidence not in (None, ""):
+        min_confidence = float(min_confidence)
+        if not math.isfinite(min_confidence):
+            raise ValueError("min_confidence must be finite")
+    else:
+        min_confidence = None
+    if label_source is not None:
+        label_source = label_source.strip() or None
+
+    return min_confidence, label_source
+
+
+def confidence_index_unavailable():
+    """
+    Queues one confidence index build rather than scanning combined_data on
+    this request, and tells the client to retry.
+    """
+    if cache.add(CONFIDENCE_INDEX_QUEUED_KEY, True, timeout=600):
+        tasks.refresh_confidence_index.delay()
+    return Response({"message": "Filtered ideology data is being built. Please try again later."}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
     
 @api_view(['GET'])
 def ideology_by_topic(request, topic):
     """
     Return cached ideology data for a specific topic.
     If not in cache, it will be computed and stored.
+    Optional ?min_confidence= and ?label_source= restrict the counted rows.
     """
-    data = get_ideology_data_for_topic(topic)
+    try:
+        min_confidence, label_source = parse_ideology_filters(request)
+    except ValueError:
+        return Response({"error": "min_confidence must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Compute from the shared analytics snapshot when one has been built
+    snapshot = get_analytics_snapshot()
+    if snapshot is not None:
+        data = snapshot.ideology_counts(topic, min_confidence, label_source)
+    else:
+        data = get_ideology_data_for_topic(topic, min_confidence, label_source)
+    if data is None:
+        return confidence_index_unavailable()
     if not data:
         return Response({"message": "No data found for topic."}, status=status.HTTP_404_NOT_FOUND)
     
@@ -144,9 +309,283 @@ def ideology_topics(request):
     """
     Return cached list of ideology topics.
     If not in cache, it will be computed and stored.
+    Optional ?min_confidence= and ?label_source= restrict the listed topics.
     """
-    data = get_ideology_topics()
+    try:
+        min_confidence, label_source = parse_ideology_filters(request)
+    except ValueError:
+        return Response({"error": "min_confidence must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+
+    snapshot = get_analytics_snapshot()
+    if snapshot is not None:
+        data = snapshot.topics(min_confidence, label_source)
+    else:
+        data = get_ideology_topics(min_confidence, label_source)
+    if data is None:
+        return confidence_index_unavailable()
     if not data:
         return Response({"message": "No data found for topics."}, status=status.HTTP_404_NOT_FOUND)
     
-    return Response(data, status=status.HTTP_200_OK)
\ No newline at end of file
+    return Response(data, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+def ideology_trends(request):
+    """
+    Return per-period post counts for a topic from the precomputed rollups.
+    Query parameters: topic (required), period (day|week|month, default week),
+    state, start and end (YYYY-MM-DD).
+    """
+    topic = request.query_params.get("topic", "").strip()
+    period = request.query_params.get("period", "week")
+    state = request.query_params.get("state") or None
+
+    if not topic:
+        return Response({"error": "topic is required."}, status=status.HTTP_400_BAD_REQUEST)
+    if period not in TREND_PERIODS:
+        return Response({"error": f"period must be one of {', '.join(TREND_PERIODS)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        start = request.query_params.get("start")
+        end = request.query_params.get("end")
+        start = date.fromisoformat(start) if start else None
+        end = date.fromisoformat(end) if end else None
+    except ValueError:
+        return Response({"error": "start and end must be dates in YYYY-MM-DD format."}, status=status.HTTP_400_BAD_REQUEST)
+
+    data = get_topic_trends(topic, period, state, start, end)
+    if data is None:
+        # Queue one build rather than scanning combined_data on this request
+        if cache.add(TOPIC_TRENDS_QUEUED_KEY, True, timeout=600):
+            tasks.refresh_topic_trend_rollups.delay()
+        return Response({"message": "Trend data is being built. Please try again later."}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    if not data:
+        return Response({"message": "No trend data found for topic."}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response(data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def top_posts(request):
+    """
+    Return the top posts for a state and topic (primary label).
+    Query parameters: state and topic (required), order_by (score|num_comments,
+    default score) and limit (default 10).
+    """
+    state = request.query_params.get("state", "").strip()
+    topic = request.query_params.get("topic", "").strip()
+    metric = request.query_params.get("order_by", "score")
+
+    if not state or not topic:
+        return Response({"error": "state and topic are required."}, status=status.HTTP_400_BAD_REQUEST)
+    if metric not in TOP_POSTS_METRICS:
+        return Response({"error": f"order_by must be one of {', '.join(TOP_POSTS_METRICS)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        limit = int(request.query_params.get("limit", 10))
+    except ValueError:
+        return Response({"error": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, TOP_POSTS_CACHE_SIZE))
+
+    data = get_top_posts(state, topic, metric, limit)
+    if not data:
+        return Response({"message": "No posts found."}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response(data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def topic_cooccurrence(request):
+    """
+    Return the topic x topic co-occurrence matrix, optionally for ?state=,
+    computed from the analytics snapshot. The diagonal holds each topic's
+    post count.
+    """
+    state = request.query_params.get("state", "").strip() or None
+    snapshot = get_analytics_snapshot()
+    if snapshot is None:
+        # Queue one build rather than loading every post's indicators on this request
+        if cache.add(ANALYTICS_SNAPSHOT_QUEUED_KEY, True, timeout=600):
+            tasks.refresh_analytics_snapshot.delay()
+        return Response({"message": "Co-occurrence data is being built. Please try again later."}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    data = snapshot.cooccurrence(state)
+    if not data:
+        return Response({"message": "No data found."}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response(data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def committees(request):
+    """
+    Return every committee with its members, or one committee for ?name=
+    (case-insensitive).
+    """
+    name = request.query_params.get("name", "").strip()
+    if not name:
+        data = get_committees()
+        if not data:
+            return Response({"message": "No committees found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(data, status=status.HTTP_200_OK)
+
+    index = get_committee_index()
+    if index.name(name) is None:
+        return Response({"error": f"Unknown committee '{name}'."}, status=status.HTTP_404_NOT_FOUND)
+    members = CongressMembers.objects.filter(bioguide_id__in=index.member_ids(name)).values(*COMMITTEE_MEMBER_FIELDS)
+    return Response(
+        {"name": index.name(name), "member_count": len(index.member_ids(name)), "members": list(members.order_by("bioguide_id"))},
+        status=status.HTTP_200_OK,
+    )
+
+
+@api_view(['GET'])
+def member_stats(request):
+    """
+    Return sponsored / cosponsored bill totals per ?group_by=state|party|chamber
+    (default state) and the per-state means of the member_proportions topic
+    columns.
+    """
+    group_by = request.query_params.get("group_by", "state")
+    if group_by not in MEMBER_STATS_GROUPS:
+        return Response(
+            {"error": f"group_by must be one of: {', '.join(MEMBER_STATS_GROUPS)}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    data = get_member_stats(group_by)
+    if not data:
+        return Response({"message": "No data found."}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response(data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def engagement_histogram(request):
+    """
+    Return the precomputed histogram and quantiles of ?metric= (score,
+    num_comments or lead_time; default score) for the optional ?topic= (primary
+    label) and ?state=. ?bins= defaults to 20 and must divide 60.
+    """
+    metric = request.query_params.get("metric", "score")
+    topic = request.query_params.get("topic", "").strip() or None
+    state = request.query_params.get("state", "").strip() or None
+
+    if metric not in ENGAGEMENT_METRICS:
+        return Response({"error": f"metric must be one of {', '.join(ENGAGEMENT_METRICS)}."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        bins = int(request.query_params.get("bins", 20))
+    except ValueError:
+        return Response({"error": "bins must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+    if bins not in ENGAGEMENT_BIN_CHOICES:
+        return Response(
+            {"error": f"bins must be one of {', '.join(map(str, ENGAGEMENT_BIN_CHOICES))}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    data = get_engagement_histogram(metric, topic, state, bins)
+    if data is None:
+        # Queue one build rather than binning every post on this request
+        if cache.add(ENGAGEMENT_QUEUED_KEY, True, timeout=600):
+            tasks.refresh_engagement_histograms.delay()
+        return Response({"message": "Engagement histograms are being built. Please try again later."}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    if not data:
+        return Response({"message": "No posts found."}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response(data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def search(request):
+    """
+    Return combined_data posts matching ?q= ranked by BM25, optionally
+    restricted by ?state= and ?topic= (primary label). ?limit= defaults to 20.
+    """
+    query = request.query_params.get("q", "").strip()
+    state = request.query_params.get("state", "").strip() or None
+    topic = request.query_params.get("topic", "").strip() or None
+
+    if not query:
+        return Response({"error": "q is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        limit = int(request.query_params.get("limit", 20))
+    except ValueError:
+        return Response({"error": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, 100))
+
+    results = search_posts(query, state, topic, limit)
+    if results is None:
+        # Queue one build rather than indexing every post on this request
+        if cache.add(SEARCH_INDEX_QUEUED_KEY, True, timeout=600):
+            tasks.refresh_search_index.delay()
+        return Response({"message": "The search index is being built. Please try again later."}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return Response(results, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def locate(request):
+    """
+    Return the state, congressional district and members for ?lat= / ?lon=.
+    """
+    try:
+        lat = float(request.query_params["lat"])
+        lon = float(request.query_params["lon"])
+    except (KeyError, ValueError):
+        return Response({"error": "lat and lon must be numbers."}, status=status.HTTP_400_BAD_REQUEST)
+    if not (math.isfinite(lat) and math.isfinite(lon) and -90 <= lat <= 90 and -180 <= lon <= 180):
+        return Response(
+            {"error": "lat must be between -90 and 90 and lon between -180 and 180."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    index = get_district_index()
+    if index is None:
+        return Response({"error": "No TopoJSON data found"}, status=status.HTTP_404_NOT_FOUND)
+
+    district = index.locate(lon, lat)
+    if district is None:
+        return Response({"message": "No district found for location."}, status=status.HTTP_404_NOT_FOUND)
+
+    # Senators have no district; the House member matches the district number
+    members = CongressMembers.objects.filter(state=district["state"]).filter(
+        Q(district__isnull=True) | Q(district=district["district"])
+    )
+    return Response({
+        "state": district["state"],
+        "state_abbr": district["state_abbr"],
+        "district": district["district"],
+        "office_id": district["office_id"],
+        "members": list(members.values()),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAdminUser])
+def profiles(request):
+    """
+    GET lists the stored request / task profiles, newest first. POST
+    {"task": "cc_app.tasks.<name>"} profiles the next run of that task.
+    """
+    if request.method == 'GET':
+        return Response(list_profiles(), status=status.HTTP_200_OK)
+
+    task_name = request.data.get("task", "")
+    module, _, name = task_name.rpartition(".")
+    if module != "cc_app.tasks" or not hasattr(getattr(tasks, name, None), "delay"):
+        return Response({"error": f"Unknown task '{task_name}'."}, status=status.HTTP_400_BAD_REQUEST)
+    arm_task_profile(task_name)
+    return Response({"message": f"The next run of {task_name} will be profiled."}, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_download(request, profile_id):
+    """
+    Download a stored profile as collapsed stacks, for flamegraph.pl or
+    speedscope.
+    """
+    collapsed = get_profile(profile_id)
+    if collapsed is None:
+        return Response({"error": "Profile not found or expired."}, status=status.HTTP_404_NOT_FOUND)
+    response = HttpResponse(collapsed, content_type="text/plain; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="profile-{profile_id}.folded"'
+    return response
@@ -4,15 +4,27 @@ from azure.keyvault.secrets import SecretClient
 
 # Fetch the vault URL from env 
 KEY_VAULT_URL = os.getenv("KEY_VAULT_URL")
-if not KEY_VAULT_URL:
+
+# Local runs (e.g. the load-test harness) can opt out of Key Vault and take each
+# secret from an environment variable named after it with "-" replaced by "_"
+# (DB-PASSWORD -> DB_PASSWORD)
+USE_ENV_SECRETS = os.getenv("USE_ENV_SECRETS", "false").lower() == "true"
+
+if not KEY_VAULT_URL and not USE_ENV_SECRETS:
     raise Exception("KEY_VAULT_URL is not set")
 
-# Authenticate using Managed Identity, Environment Credentials, or Azure CLI
-cred = DefaultAzureCredential()
+client = None
+if KEY_VAULT_URL:
+    # Authenticate using Managed Identity, Environment Credentials, or Azure CLI
+    cred = DefaultAzureCredential()
 
-# Create a SecretClient
-client = SecretClient(vault_url=KEY_VAULT_URL, credential=cred)
+    # Create a SecretClient
+    client = SecretClient(vault_url=KEY_VAULT_URL, credential=cred)
 
 def get_secret(secret_name):
+    if client is None:
+        env_name = secret_name.replace("-", "_")
+        if env_name not in os.environ:
+            raise KeyError(f"Secret {secret_name} is not set (expected env var {env_name})")
+        return os.environ[env_name]
     return client.get_secret(secret_name).value 
-
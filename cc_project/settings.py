@@ -48,7 +48,8 @@ SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 REDIS_HOST = os.getenv("AZURE_REDIS_HOST")
 REDIS_PORT = os.getenv("AZURE_REDIS_PORT")
 REDIS_PWD = get_secret("REDIS-PWD")
-REDIS_URL = f"rediss://:{REDIS_PWD}@{REDIS_HOST}:{REDIS_PORT}/0"
+USE_SSL = os.getenv("AZURE_REDIS_SSL", "true").lower() == "true"
+REDIS_URL = f"{'rediss' if USE_SSL else 'redis'}://:{REDIS_PWD}@{REDIS_HOST}:{REDIS_PORT}/0"
 
 # Celery Configuration
 CELERY_BROKER_URL = REDIS_URL
@@ -56,6 +57,27 @@ CELERY_RESULT_BACKEND = REDIS_URL
 CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'application/json'
 
+# Periodic rebuilds of derived tables, run by `celery -A cc_project beat`.
+# Requests only read them and never rebuild them inline.
+CELERY_BEAT_SCHEDULE = {
+    "refresh-topic-trend-rollups": {
+        "task": "cc_app.tasks.refresh_topic_trend_rollups",
+        "schedule": 14400,
+    },
+    "refresh-confidence-index": {
+        "task": "cc_app.tasks.refresh_confidence_index",
+        "schedule": 14400,
+    },
+    "refresh-engagement-histograms": {
+        "task": "cc_app.tasks.refresh_engagement_histograms",
+        "schedule": 14400,
+    },
+    "refresh-analytics-snapshot": {
+        "task": "cc_app.tasks.refresh_analytics_snapshot",
+        "schedule": 14400,
+    },
+}
+
 
 # Application definition
 
@@ -83,6 +105,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "cc_app.db_routers.PrimaryForWritesMiddleware",
+    "cc_app.profiling.ProfilingMiddleware",
 ]
 
 CORS_ALLOWED_ORIGINS = [
@@ -111,7 +135,6 @@ TEMPLATES = [
 WSGI_APPLICATION = "cc_project.wsgi.application"
 
 # Redis Cache
-USE_SSL = os.getenv("AZURE_REDIS_SSL", "true").lower() == "true"
 CACHES = {
     'default': {
         'BACKEND': 'django_redis.cache.RedisCache',
@@ -138,9 +161,12 @@ except Exception as e:
     ssl_cert_path = None
     print(f"❌ Failed to pull SSL cert from Key Vault: {e}")
 
+# DB_ENGINE lets local runs swap in another backend (e.g. SQLite for the load-test harness)
+DB_ENGINE = os.getenv("DB_ENGINE", "django.db.backends.mysql")
+
 DATABASES = {
    "default": {
-      "ENGINE": "django.db.backends.mysql",
+      "ENGINE": DB_ENGINE,
         "NAME": get_secret("DB-NAME"),
         "USER": get_secret("DB-USER"),
         "PASSWORD": get_secret("DB-PASSWORD"),
@@ -148,10 +174,28 @@ DATABASES = {
         "PORT": get_secret("DB-PORT"),
         "OPTIONS": {
             "ssl": {"ca": ssl_cert_path} if ssl_cert_path and os.path.exists(ssl_cert_path) else {},
-        }
+        } if DB_ENGINE == "django.db.backends.mysql" else {},
+        # Keep connections open across requests instead of paying a new
+        # connection + SSL handshake each time; check them before reuse
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "600")),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Optional read replica. When DB_REPLICA_HOST is set, read-only traffic goes to
+# the "replica" alias (same credentials) and writes and migrations stay on
+# "default"; see cc_app/db_routers.py.
+DB_REPLICA_HOST = os.getenv("DB_REPLICA_HOST")
+if DB_REPLICA_HOST:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": DB_REPLICA_HOST,
+        "PORT": os.getenv("DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_READ_ALIAS = os.getenv("DB_READ_ALIAS", "replica" if DB_REPLICA_HOST else "default")
+DATABASE_ROUTERS = ["cc_app.db_routers.PrimaryReplicaRouter"]
+
 
 
 # Password validation
@@ -190,7 +234,7 @@ USE_TZ = True
 
 STATIC_URL = "/static/"
 STATICFILES_DIRS = []
-STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+STATIC_ROOT = os.getenv("STATIC_ROOT", os.path.join(BASE_DIR, 'staticfiles'))
 
 
 ## Use WhiteNoise's storage backend that appends a unique hash to filenames,
@@ -198,6 +242,34 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 WHITENOISE_KEEP_ONLY_HASHED_FILES = False
 
+## Serve any file named <name>.<12 hex hash>.<ext> with far-future cache headers.
+## Covers the manifest storage's hashed files. The API snapshots written to
+## STATIC_ROOT/snapshots by `manage.py publish_snapshots` are served by the
+## snapshot_file view instead, since WhiteNoise only indexes files at startup.
+WHITENOISE_IMMUTABLE_FILE_TEST = r"\.[0-9a-f]{12}\.\w+$"
+
+# Memory-mapped analytics snapshot shared by all workers on the host
+# (written by `manage.py build_analytics_snapshot` on deploy and by the Celery
+# beat task). Point it at storage mounted on both the web and worker hosts so
+# the scheduled rebuilds reach the web workers.
+ANALYTICS_SNAPSHOT_DIR = os.getenv("ANALYTICS_SNAPSHOT_DIR", os.path.join(BASE_DIR, 'analytics_snapshot'))
+# Older snapshots, or ones whose row count no longer matches combined_data,
+# are ignored and the endpoints query the database instead
+ANALYTICS_SNAPSHOT_MAX_AGE = int(os.getenv("ANALYTICS_SNAPSHOT_MAX_AGE", 8 * 3600))
+
+# TopoJSON uploads larger than this are rejected while streaming; the newest
+# TOPOJSON_KEEP_VERSIONS versions of each layer are kept (plus the current one)
+TOPOJSON_MAX_UPLOAD_BYTES = int(os.getenv("TOPOJSON_MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+TOPOJSON_KEEP_VERSIONS = int(os.getenv("TOPOJSON_KEEP_VERSIONS", "3"))
+
+# Sampling profiler for requests and cc_app tasks (see cc_app/profiling.py).
+# Staff can force a request profile with an "X-Profile: 1" header; profiles
+# are listed and downloaded at /api/profiles/.
+PROFILER_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", "0"))  # fraction profiled in full
+PROFILER_SLOW_THRESHOLD_MS = int(os.getenv("PROFILER_SLOW_THRESHOLD_MS", "0"))  # 0 disables
+PROFILER_INTERVAL_MS = int(os.getenv("PROFILER_INTERVAL_MS", "10"))
+PROFILER_MAX_STORED = int(os.getenv("PROFILER_MAX_STORED", "50"))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
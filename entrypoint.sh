@@ -9,6 +9,16 @@ python manage.py collectstatic --noinput
 echo "Running migrations..."
 python manage.py migrate --fake-initial --noinput
 
+# Build the analytics snapshot memory-mapped by every worker; the aggregation
+# endpoints fall back to the database if this fails
+echo "Building analytics snapshot..."
+python manage.py build_analytics_snapshot || echo "Analytics snapshot build failed, aggregating from the database"
+
+# Publish static snapshots of the read-only API data (served by WhiteNoise);
+# the dashboard falls back to the API if this fails
+echo "Publishing API snapshots..."
+python manage.py publish_snapshots || echo "Snapshot publish failed, serving from the API"
+
 # If we get here, the import worked, so start Gunicorn
 echo "Starting Gunicorn..."
 exec gunicorn cc_project.wsgi:application --bind 0.0.0.0:$PORT --workers 3
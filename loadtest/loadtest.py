@@ -0,0 +1,220 @@
+"""
+Replays the dashboard's request mix against a running server and reports
+throughput, latency percentiles, error rate and Redis / MySQL load.
+
+    python loadtest/loadtest.py --base-url http://127.0.0.1:8000 --concurrency 20 --duration 60
+
+Redis and MySQL deltas are read from the servers given by --redis-url and the
+DB_* environment variables (the same ones loadtest/run.sh exports) and are
+skipped if they can't be reached.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+TOPICS = [
+    "Agriculture and Food", "Crime and Law Enforcement", "Economy and Finance", "Health and Healthcare",
+    "Immigration and Civil Rights", "Transportation and Infrastructure",
+]
+STATES = ["California", "Texas", "New York", "Florida", "Ohio", "Washington"]
+
+# (weight, name, path) roughly matching what one dashboard visit and the
+# interactions after it request
+REQUEST_MIX = [
+    (10, "dashboard", lambda: "/"),
+    (10, "bootstrap", lambda: "/api/dashboard_bootstrap/"),
+    (4, "states_geojson", lambda: "/api/us_states_topojson/?format=geojson"),
+    (4, "districts_geojson", lambda: "/api/us_districts_topojson/?format=geojson"),
+    (6, "congress_members", lambda: "/api/congress_members/"),
+    (6, "member_proportions", lambda: "/api/member_proportions/"),
+    (8, "ideology_topics", lambda: "/api/ideology_topics/"),
+    (15, "ideology_by_topic", lambda: f"/api/ideology_data_by_topic/{urllib.parse.quote(random.choice(TOPICS))}/"),
+    (5, "ideology_trends", lambda: "/api/ideology_trends/?" + urllib.parse.urlencode({"topic": random.choice(TOPICS), "period": "week"})),
+    (8, "top_posts", lambda: "/api/posts/?" + urllib.parse.urlencode({"state": random.choice(STATES), "topic": random.choice(TOPICS)})),
+    (4, "topic_cooccurrence", lambda: "/api/topic_cooccurrence/?" + urllib.parse.urlencode({"state": random.choice(STATES)})),
+    (6, "search", lambda: "/api/search/?" + urllib.parse.urlencode({"q": random.choice(["tax", "health care", "border police", "wildfire"])})),
+    (4, "locate", lambda: "/api/locate/?" + urllib.parse.urlencode(random_point())),
+]
+
+REDIS_INFO_FIELDS = ["total_commands_processed", "keyspace_hits", "keyspace_misses", "total_net_input_bytes", "total_net_output_bytes"]
+MYSQL_STATUS_FIELDS = ["Questions", "Com_select", "Connections", "Threads_created", "Bytes_sent", "Innodb_rows_read"]
+
+
+def random_point():
+    """
+    Returns a point inside one of load_synthetic_data's state rectangles
+    (4 x 4 degree cells, 7 degrees apart in longitude and 6 in latitude).
+    """
+    lon = -124 + 7 * random.randint(0, 7) + random.uniform(0.1, 3.9)
+    lat = 30 + 6 * random.randint(0, 1) + random.uniform(0.1, 3.9)
+    return {"lat": round(lat, 3), "lon": round(lon, 3)}
+
+
+def pick_request():
+    weights = [weight for weight, _, _ in REQUEST_MIX]
+    _, name, path = random.choices(REQUEST_MIX, weights=weights)[0]
+    return name, path()
+
+
+def send(base_url, timeout):
+    name, path = pick_request()
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(base_url + path, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return name, status, time.perf_counter() - start
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))]
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    return {
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+    }
+
+
+def redis_info(redis_url):
+    """
+    Returns the Redis INFO counters, or None if redis-py is missing or the
+    server can't be reached.
+    """
+    try:
+        import redis
+        info = redis.Redis.from_url(redis_url).info()
+    except Exception as e:
+        print(f"Skipping Redis stats: {e}")
+        return None
+    return {field: info.get(field, 0) for field in REDIS_INFO_FIELDS}
+
+
+def mysql_status():
+    """
+    Returns MySQL global status counters, or None when the harness runs on
+    SQLite or the server can't be reached.
+    """
+    if os.getenv("DB_ENGINE", "django.db.backends.mysql") != "django.db.backends.mysql":
+        return None
+    try:
+        import pymysql
+        connection = pymysql.connect(
+            host=os.getenv("DB_HOST", "127.0.0.1"), port=int(os.getenv("DB_PORT", "3306")),
+            user=os.getenv("DB_USER", "root"), password=os.getenv("DB_PASSWORD", ""),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW GLOBAL STATUS")
+            status = dict(cursor.fetchall())
+        connection.close()
+    except Exception as e:
+        print(f"Skipping MySQL stats: {e}")
+        return None
+    return {field: int(status.get(field, 0)) for field in MYSQL_STATUS_FIELDS}
+
+
+def delta(before, after):
+    if before is None or after is None:
+        return None
+    return {field: after[field] - before[field] for field in before}
+
+
+def run(base_url, concurrency, duration, total_requests, timeout):
+    results = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration if duration else None
+    issued = 0
+
+    def worker():
+        nonlocal issued
+        while True:
+            with lock:
+                if total_requests is not None and issued >= total_requests:
+                    return
+                issued += 1
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            result = send(base_url, timeout)
+            with lock:
+                results.append(result)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the dashboard request mix and report latency and backend load.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run for (ignored if --requests is given).")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests.")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--redis-url", default=os.getenv("LOADTEST_REDIS_URL", "redis://127.0.0.1:6379/0"))
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip("/")
+    redis_before, mysql_before = redis_info(args.redis_url), mysql_status()
+    results, elapsed = run(base_url, args.concurrency, None if args.requests else args.duration, args.requests, args.timeout)
+    redis_after, mysql_after = redis_info(args.redis_url), mysql_status()
+
+    by_endpoint = defaultdict(list)
+    errors = defaultdict(int)
+    for name, status, latency in results:
+        by_endpoint[name].append(latency)
+        if status is None or status >= 400:
+            errors[name] += 1
+
+    report = {
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "requests": len(results),
+        "throughput_rps": round(len(results) / elapsed, 1) if elapsed else None,
+        "error_rate": round(sum(errors.values()) / len(results), 4) if results else None,
+        **summarize([latency for _, _, latency in results]),
+        "endpoints": {
+            name: {**summarize(latencies), "errors": errors[name]}
+            for name, latencies in sorted(by_endpoint.items())
+        },
+        "redis": delta(redis_before, redis_after),
+        "mysql": delta(mysql_before, mysql_after),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{report['requests']} requests in {report['elapsed_s']} s at concurrency {args.concurrency}: "
+          f"{report['throughput_rps']} req/s, error rate {report['error_rate']}")
+    print(f"Latency p50 {report['p50_ms']} ms, p95 {report['p95_ms']} ms, p99 {report['p99_ms']} ms")
+    print(f"\n{'endpoint':<20}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, stats in report["endpoints"].items():
+        print(f"{name:<20}{stats['count']:>8}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['errors']:>8}")
+    for label, stats in (("Redis", report["redis"]), ("MySQL", report["mysql"])):
+        if stats:
+            print(f"\n{label}: " + ", ".join(f"{field} +{value}" for field, value in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/bin/bash
+# Boots the app as entrypoint.sh does against local stand-ins (SQLite or a
+# local MySQL, a local Redis, secrets from env vars instead of Key Vault),
+# loads synthetic data and runs loadtest.py against it. Extra arguments are
+# passed to loadtest.py, e.g.:
+#
+#   loadtest/run.sh --concurrency 20 --duration 60
+#   WORKERS=6 LOADTEST_DB=mysql DB_PASSWORD=secret loadtest/run.sh --json
+set -e
+
+cd "$(dirname "$0")/.."
+
+export DJANGO_ENV=loadtest
+export USE_ENV_SECRETS=true
+export SECRET_KEY=${SECRET_KEY:-loadtest-secret-key}
+export AZURE_REDIS_HOST=${AZURE_REDIS_HOST:-127.0.0.1}
+export AZURE_REDIS_PORT=${AZURE_REDIS_PORT:-6379}
+export AZURE_REDIS_SSL=false
+export REDIS_PWD=${REDIS_PWD:-}
+export LOADTEST_REDIS_URL=${LOADTEST_REDIS_URL:-redis://:$REDIS_PWD@$AZURE_REDIS_HOST:$AZURE_REDIS_PORT/0}
+
+if [ "${LOADTEST_DB:-sqlite}" = "mysql" ]; then
+    export DB_ENGINE=django.db.backends.mysql
+    export DB_NAME=${DB_NAME:-cc_loadtest}
+    export DB_USER=${DB_USER:-root}
+    export DB_PASSWORD=${DB_PASSWORD:-}
+    export DB_HOST=${DB_HOST:-127.0.0.1}
+    export DB_PORT=${DB_PORT:-3306}
+else
+    mkdir -p loadtest/.data
+    export DB_ENGINE=django.db.backends.sqlite3
+    export DB_NAME=${DB_NAME:-$PWD/loadtest/.data/db.sqlite3}
+    export DB_USER="" DB_PASSWORD="" DB_HOST="" DB_PORT=""
+fi
+
+# Keep collectstatic output and snapshots out of the repo's staticfiles/
+mkdir -p loadtest/.data
+export STATIC_ROOT=${STATIC_ROOT:-$PWD/loadtest/.data/static}
+export ANALYTICS_SNAPSHOT_DIR=${ANALYTICS_SNAPSHOT_DIR:-$PWD/loadtest/.data/analytics_snapshot}
+
+export PORT=${PORT:-8000}
+WORKERS=${WORKERS:-3}
+POSTS=${POSTS:-20000}
+
+echo "Preparing database ($DB_ENGINE) and synthetic data..."
+python manage.py collectstatic --noinput > /dev/null
+python manage.py migrate --noinput
+python manage.py load_synthetic_data --posts "$POSTS" --yes
+python manage.py publish_snapshots
+
+echo "Starting Gunicorn with $WORKERS workers..."
+gunicorn cc_project.wsgi:application --bind 127.0.0.1:$PORT --workers "$WORKERS" --log-level warning &
+GUNICORN_PID=$!
+trap 'kill $GUNICORN_PID 2>/dev/null; wait $GUNICORN_PID 2>/dev/null' EXIT
+
+for _ in $(seq 1 30); do
+    curl -sf -o /dev/null "http://127.0.0.1:$PORT/api/ideology_topics/" && break
+    sleep 1
+done
+
+python loadtest/loadtest.py --base-url "http://127.0.0.1:$PORT" "$@"